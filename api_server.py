@@ -0,0 +1,20 @@
+"""Local HTTP API for programmatic contract analysis.
+
+Usage:
+    python api_server.py
+    curl -F "file=@samples/lease_sample.pdf" http://localhost:8000/jobs
+    curl "http://localhost:8000/jobs/<job_id>?wait=30"
+"""
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import uvicorn
+from src.api.server import create_app
+from src.config import API_HOST, API_PORT
+
+if __name__ == "__main__":
+    # A single process - the job queue lives in memory
+    uvicorn.run(create_app(), host=API_HOST, port=API_PORT)
@@ -2,134 +2,85 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
+from datetime import datetime, timedelta
 
 # Add src to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from src.parsers.document_parser import DocumentParser
-from src.parsers.clause_extractor import ClauseExtractor
-from src.nlp.contract_classifier import ContractClassifier
-from src.nlp.entity_extractor import EntityExtractor
-from src.nlp.clause_analyzer import ClauseAnalyzer
-from src.nlp.ambiguity_detector import AmbiguityDetector
-from src.risk.risk_detector import RiskDetector
-from src.risk.risk_scorer import RiskScorer
-from src.risk.compliance_checker import ComplianceChecker
-from src.legal.alternative_suggester import AlternativeSuggester
-from src.multilingual.language_detector import LanguageDetector
-from src.multilingual.translator import ContractTranslator
 from src.data.audit_logger import AuditLogger
-from src.ui.components import render_risk_gauge, render_clause_card, render_entity_summary
+from src.pipeline.analysis import AnalysisPipeline
+from src.ui.components import (render_risk_gauge, render_clause_card, render_entity_summary,
+                               render_compliance_issues, render_trace_panel)
 from src.legal.templates import TEMPLATES
-from src.config import STORAGE_DIR
+from src.core.registry import preload, get_llm_memo, get_llm_gateway, get_clause_index
+from src.config import STORAGE_DIR, OPENAI_API_KEY
 
 # Page Config
 st.set_page_config(page_title="SME Legal Assistant", layout="wide", page_icon="⚖️")
 
+# Warm shared models in the background so the first analysis doesn't pay the load cost
+preload()
+
 # Initialize Session State
 if 'analysis_results' not in st.session_state:
     st.session_state.analysis_results = None
 
-def run_analysis(temp_path, filename):
-    with st.spinner("Analyzing contract... This may take a minute."):
-        parser = DocumentParser()
-        raw_text = parser.parse(temp_path)
-        clean_text = parser.clean_text(raw_text)
-        
-        # Language Detection & Translation
-        lang_detector = LanguageDetector()
-        is_hindi = lang_detector.is_hindi(clean_text)
-        
-        analysis_text = clean_text
-        if is_hindi:
-            st.info("Hindi contract detected. Translating for analysis...")
-            translator = ContractTranslator()
-            analysis_text = translator.translate_to_english(clean_text)
-            
-        # Classification
-        classifier = ContractClassifier()
-        contract_type = classifier.classify(analysis_text)
-        
-        # Entity Extraction
-        entity_extractor = EntityExtractor()
-        entities = entity_extractor.extract(analysis_text)
-        
-        # Clause Extraction
-        extractor = ClauseExtractor()
-        clauses = extractor.extract_clauses(analysis_text)
-        
-        # Clause Analysis
-        analyzer = ClauseAnalyzer()
-        ambiguity_detector = AmbiguityDetector()
-        risk_detector = RiskDetector()
-        risk_scorer = RiskScorer()
-        suggester = AlternativeSuggester()
-        
-        processed_clauses = []
-        for i, c in enumerate(clauses):
-            # Categorization & Explanation
-            analysis = analyzer.analyze_clause(c["content"])
-            
-            # Risk Detection
-            detected_risks = risk_detector.detect_risks(c["content"])
-            
-            # Ambiguity Detection
-            ambiguities = ambiguity_detector.detect_ambiguities_llm(c["content"])
-            
-            # Scoring
-            score_data = risk_scorer.calculate_clause_score(
-                analysis["category"], 
-                detected_risks, 
-                len(ambiguities)
-            )
-            
-            # Alternative Suggestion for High/Medium Risk
-            alternative_data = {}
-            if score_data["label"] in ["HIGH", "MEDIUM"] and detected_risks:
-                alternative_data = suggester.suggest_alternative(c["content"], detected_risks)
-            
-            processed_clauses.append({
-                "header": c["header"],
-                "content": c["content"],
-                "category": analysis["category"],
-                "explanation": analysis["explanation"],
-                "detected_risks": detected_risks,
-                "ambiguities": ambiguities,
-                "risk_score": score_data["score"],
-                "risk_label": score_data["label"],
-                "risk_color": score_data["color"],
-                "alternative": alternative_data.get("alternative"),
-                "alternative_explanation": alternative_data.get("explanation")
-            })
-            
-        # Contract Level Score
-        contract_risk = risk_scorer.calculate_contract_score(processed_clauses)
-        
-        # Compliance Check
-        compliance_checker = ComplianceChecker()
-        compliance_issues = compliance_checker.check_compliance(contract_type, analysis_text)
-        
-        results = {
-            "filename": filename,
-            "contract_type": contract_type,
-            "entities": entities,
-            "clauses": processed_clauses,
-            "risk_summary": contract_risk,
-            "compliance_issues": compliance_issues,
-            "is_hindi": is_hindi
-        }
-        
-        # Audit Log
-        logger = AuditLogger()
-        logger.log_analysis(filename, contract_type, contract_risk["score"], contract_risk)
+def run_analysis(temp_path, filename, force=False):
+    """Streams partial results into placeholders while the pipeline runs."""
+    live = st.empty()
+    results = None
+    with live.container():
+        status = st.empty()
+        status.info("Analyzing contract... Results appear as each stage finishes.")
+        overview = st.container()
+        clause_progress = None
+        clause_slots = []
+        compliance_slot = None
+        translated = False
+        completed = 0
         
-        return results
+        for event, payload in AnalysisPipeline().iter_run(temp_path, filename, force=force, progress=status.info):
+            if event == "overview":
+                with overview:
+                    st.markdown(f"## {payload['contract_type']}")
+                    st.markdown(f"**File:** {payload['filename']}")
+                    render_entity_summary(payload["entities"])
+                    st.markdown("---")
+                    st.subheader("🔍 Clause Analysis")
+                clause_progress = st.progress(0.0, text=f"0 of {payload['clause_count']} clauses analysed")
+                # One slot per clause so cards stay in document order whatever order they finish in
+                clause_slots = [st.empty() for _ in range(payload["clause_count"])]
+                compliance_slot = st.empty()
+                translated = payload["is_hindi"]
+                status.info("Analyzing clauses...")
+            elif event == "clause":
+                completed += 1
+                with clause_slots[payload["index"]].container():
+                    render_clause_card(payload["clause"], payload["index"] + 1, translated=translated)
+                clause_progress.progress(completed / len(clause_slots),
+                                         text=f"{completed} of {len(clause_slots)} clauses analysed")
+            elif event == "compliance":
+                with compliance_slot.container():
+                    st.markdown("---")
+                    render_compliance_issues(payload["compliance_issues"])
+                status.info("Compliance check complete. Finalizing report...")
+            elif event == "complete":
+                results = payload
+    
+    # Swap the live view for the full dashboard below
+    live.empty()
+    return results
 
 # Sidebar
 st.sidebar.title("⚖️ Legal Assistant")
 st.sidebar.markdown("GenAI-powered contract analysis for Indian SMEs.")
 
-menu = st.sidebar.radio("Navigation", ["Upload & Analyze", "Analysis History", "Templates"])
+menu = st.sidebar.radio("Navigation", ["Upload & Analyze", "Analysis History", "Clause Search", "Templates"])
+show_diagnostics = st.sidebar.checkbox("Show diagnostics", value=False)
+
+# The gateway's circuit breaker switches every stage to heuristics during provider outages
+if OPENAI_API_KEY and not get_llm_gateway().is_available():
+    st.sidebar.warning("LLM service unavailable - using heuristic analysis until it recovers.")
 
 if menu == "Upload & Analyze":
     st.title("Upload Contract")
@@ -140,8 +91,9 @@ if menu == "Upload & Analyze":
         with open(temp_path, "wb") as f:
             f.write(uploaded_file.getbuffer())
             
+        force = st.checkbox("Force re-analysis (ignore cached results)")
         if st.button("Start Analysis"):
-            st.session_state.analysis_results = run_analysis(temp_path, uploaded_file.name)
+            st.session_state.analysis_results = run_analysis(temp_path, uploaded_file.name, force=force)
             
     if st.session_state.analysis_results:
         res = st.session_state.analysis_results
@@ -157,6 +109,8 @@ if menu == "Upload & Analyze":
             st.markdown(f"**File:** {res['filename']}")
             if res["is_hindi"]:
                 st.caption("Auto-translated from Hindi to English")
+            if res.get("from_cache"):
+                st.caption("Loaded from cache - use 'Force re-analysis' to re-run")
                 
         with col3:
             st.metric("High Risk Clauses", res["risk_summary"]["high_risk_count"])
@@ -172,29 +126,122 @@ if menu == "Upload & Analyze":
             
         with tab_clauses:
             for idx, clause in enumerate(res["clauses"]):
-                render_clause_card(clause, idx + 1)
+                render_clause_card(clause, idx + 1, translated=res["is_hindi"])
                 
         with tab_compliance:
-            st.subheader("Legal Compliance (Indian Law)")
-            if res["compliance_issues"]:
-                for issue in res["compliance_issues"]:
-                    with st.expander(issue["issue"]):
-                        st.write(f"**Relevant Law:** {issue['law']}")
-                        st.write(f"**Risk:** {issue['risk']}")
-                        st.info(f"**Recommendation:** {issue['recommendation']}")
-            else:
-                st.success("No major compliance issues detected based on preliminary analysis.")
+            render_compliance_issues(res["compliance_issues"])
+        
+        if show_diagnostics and res.get("trace"):
+            render_trace_panel(res["trace"])
 
 elif menu == "Analysis History":
     st.title("Audit Trail")
     logger = AuditLogger()
-    logs = logger.get_logs()
-    if logs:
-        df = pd.DataFrame(logs)
+    
+    # Filters are pushed down to the indexed audit store; only one page is loaded
+    fcol1, fcol2, fcol3 = st.columns(3)
+    with fcol1:
+        date_range = st.date_input("Date range", value=())
+    with fcol2:
+        type_filter = st.selectbox("Contract type", ["All"] + logger.contract_types())
+    with fcol3:
+        min_risk = st.slider("Minimum risk score", 0.0, 10.0, 0.0, 0.5)
+    
+    filters = {
+        "contract_type": None if type_filter == "All" else type_filter,
+        "min_risk": min_risk or None
+    }
+    if len(date_range) == 2:
+        filters["since"] = datetime.combine(date_range[0], datetime.min.time())
+        filters["until"] = datetime.combine(date_range[1] + timedelta(days=1), datetime.min.time())
+    
+    total = logger.count(**filters)
+    if total:
+        st.metric("Matching Analyses", total)
+        
+        scol1, scol2 = st.columns(2)
+        with scol1:
+            st.markdown("**By Contract Type**")
+            st.dataframe(pd.DataFrame(logger.summarize_by_type(**filters)), use_container_width=True)
+        with scol2:
+            st.markdown("**By Day**")
+            by_day = pd.DataFrame(logger.summarize_by_day(**filters))
+            st.line_chart(by_day.set_index("day")[["count", "avg_risk"]])
+        
+        pcol1, pcol2 = st.columns([1, 3])
+        with pcol1:
+            page_size = st.selectbox("Rows per page", [25, 50, 100], index=1)
+        page_count = max((total + page_size - 1) // page_size, 1)
+        with pcol2:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+        
+        df = pd.DataFrame(logger.query(limit=page_size, offset=(page - 1) * page_size, **filters))
         df['timestamp'] = pd.to_datetime(df['timestamp'])
-        st.dataframe(df.sort_values('timestamp', ascending=False), use_container_width=True)
+        st.dataframe(df, use_container_width=True)
     else:
         st.info("No analysis history found.")
+        
+    # LLM response memo savings
+    memo_stats = get_llm_memo().stats()
+    if memo_stats:
+        st.subheader("LLM Response Cache")
+        st.dataframe(pd.DataFrame([
+            {"stage": name, "hits": c["hits"], "misses": c["misses"],
+             "hit_rate": round(c["hits"] / max(c["hits"] + c["misses"], 1), 2)}
+            for name, c in memo_stats.items()
+        ]), use_container_width=True)
+    
+    # Per-stage LLM call metrics for this server process
+    gateway_metrics = get_llm_gateway().metrics()
+    if gateway_metrics:
+        st.subheader("LLM Calls (since server start)")
+        st.dataframe(pd.DataFrame([
+            {"stage": name, "calls": m["calls"], "retries": m["retries"], "failures": m["failures"],
+             "avg_latency_s": m["latency_avg"], "max_latency_s": round(m["latency_max"], 3),
+             "prompt_tokens": m["prompt_tokens"], "completion_tokens": m["completion_tokens"],
+             "throttled_s": round(m["throttle_seconds"], 2)}
+            for name, m in gateway_metrics.items()
+        ]), use_container_width=True)
+
+elif menu == "Clause Search":
+    st.title("Clause Search")
+    st.markdown("Find similar clauses across every contract analysed so far.")
+    index = get_clause_index()
+    if index is None:
+        st.error("The clause index was built with a different embedding model. Run `python reindex_clauses.py` to re-embed it.")
+        st.stop()
+    
+    query = st.text_input("Describe the clause you are looking for", placeholder="termination without notice")
+    qcol1, qcol2, qcol3, qcol4 = st.columns(4)
+    with qcol1:
+        category_filter = st.selectbox("Category", ["All"] + index.distinct("category"))
+    with qcol2:
+        type_filter = st.selectbox("Contract type", ["All"] + index.distinct("contract_type"))
+    with qcol3:
+        date_range = st.date_input("Analysed between", value=())
+    with qcol4:
+        top_k = st.slider("Results", 5, 50, 10, 5)
+    
+    if query:
+        filters = {
+            "category": None if category_filter == "All" else category_filter,
+            "contract_type": None if type_filter == "All" else type_filter
+        }
+        if len(date_range) == 2:
+            filters["since"] = datetime.combine(date_range[0], datetime.min.time())
+            filters["until"] = datetime.combine(date_range[1] + timedelta(days=1), datetime.min.time())
+        hits = index.search(query, k=top_k, **filters)
+        if hits:
+            for hit in hits:
+                with st.expander(f"{hit['score']:.2f} - {hit['header'] or 'Clause'} ({hit['filename']})"):
+                    st.write(hit["content"])
+                    st.caption(f"{hit['category']} | {hit['contract_type']} | Risk {hit['risk_label']} "
+                               f"({hit['risk_score']}) | Analysed {hit['analyzed_at'][:10]}")
+                    if hit["risks"]:
+                        st.markdown("**Risks:** " + ", ".join(hit["risks"]))
+        else:
+            st.info("No matching clauses found.")
+    st.caption(f"{index.count()} clauses indexed.")
 
 elif menu == "Templates":
     st.title("SME Contract Templates")
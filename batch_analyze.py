@@ -0,0 +1,16 @@
+"""Headless batch analysis of contract archives.
+
+Usage:
+    python batch_analyze.py contracts/ -o results/ --workers 4
+    python batch_analyze.py "archive/**/*.pdf" -o results.jsonl --jsonl
+"""
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.pipeline.batch import main
+
+if __name__ == "__main__":
+    sys.exit(main())
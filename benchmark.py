@@ -0,0 +1,17 @@
+"""End-to-end pipeline benchmarks with a mocked LLM and translator.
+
+Usage:
+    python benchmark.py                      # compare against data/benchmarks/baseline.json
+    python benchmark.py --save-baseline      # record a new baseline
+    python benchmark.py --sizes 10 100 --hindi-sizes --llm-latency 0.2
+"""
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.benchmark.runner import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,13 @@
+import argparse
 import os
+import random
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfgen import canvas
 from reportlab.lib import colors
 
-def create_pdf(filename, title, content):
-    os.makedirs('samples', exist_ok=True)
-    c = canvas.Canvas(f"samples/{filename}", pagesize=letter)
+def create_pdf(filename, title, content, out_dir='samples'):
+    os.makedirs(out_dir, exist_ok=True)
+    c = canvas.Canvas(os.path.join(out_dir, filename), pagesize=letter)
     width, height = letter
     
     # Title
@@ -107,7 +109,73 @@ hindi_content = """किराया अनुबंध (LEASE AGREEMENT)
 किसी भी कानूनी विवाद का निपटारा दिल्ली की अदालतों में किया जाएगा।
 """
 
-if __name__ == "__main__":
+# 4. Synthetic contracts of any length (benchmark corpora)
+# Clause bodies are filled from a seeded RNG, so the same size and seed always give the same text.
+SYNTHETIC_PARTIES = [
+    ("ABC Solutions Pvt Ltd", "Rajesh Kumar"), ("Global Supplies Inc.", "FastLogistics India"),
+    ("Sharma Textiles LLP", "Verma Traders"), ("Bharat Infra Ltd", "Nexus Consulting Services"),
+]
+SYNTHETIC_CITIES = ["Delhi", "Mumbai", "Bangalore", "Chennai", "Pune", "Hyderabad", "Kolkata"]
+
+SYNTHETIC_CLAUSES = [
+    ("SERVICES", "The Service Provider shall perform the services described in Schedule {n} in a timely and professional manner."),
+    ("PAYMENT", "The Client shall pay INR {amount} within {days} days of receiving a valid invoice. Late payments will incur a penalty of {percent}% per month."),
+    ("CONFIDENTIALITY", "Neither party shall disclose any confidential information of the other party to any third party during the term and for {months} months thereafter."),
+    ("LIABILITY", "The Vendor's liability for any loss or damage is limited to INR {amount} only, regardless of the actual loss suffered."),
+    ("INDEMNIFICATION", "The Contractor shall indemnify and hold harmless the Company against all claims, damages and expenses arising out of the Contractor's negligence."),
+    ("TERMINATION", "Either party may terminate this agreement by giving {days} days written notice. The Company may terminate immediately without notice in case of material breach."),
+    ("NON-COMPETE", "The Employee agrees not to work for any competitor of the Employer for a period of {months} months after termination within India."),
+    ("INTELLECTUAL PROPERTY", "All intellectual property created during the term shall vest exclusively in the Client, and the Vendor waives all moral rights."),
+    ("WARRANTIES", "The Supplier warrants that the goods shall be free from defects for {months} months and fit for a reasonable purpose."),
+    ("FORCE MAJEURE", "Neither party shall be liable for delays caused by events beyond its reasonable control, including floods, strikes and epidemics."),
+    ("ARBITRATION", "Any dispute shall be referred to arbitration by a sole arbitrator seated in {city} under the Arbitration and Conciliation Act, 1996."),
+    ("GOVERNING LAW", "This agreement shall be governed by the laws of India and the courts in {city} shall have exclusive jurisdiction."),
+]
+
+SYNTHETIC_CLAUSES_HI = [
+    ("किराया", "किरायेदार हर महीने की {day} तारीख तक {amount} रुपये का किराया देगा।"),
+    ("सुरक्षा जमा", "किरायेदार {amount} रुपये सुरक्षा जमा के रूप में देगा जो कि खाली करते समय वापस कर दिया जाएगा।"),
+    ("अवधि", "यह अनुबंध {months} महीने की अवधि के लिए है।"),
+    ("बिजली और पानी", "बिजली और पानी का बिल किरायेदार द्वारा अलग से दिया जाएगा।"),
+    ("समाप्ति", "कोई भी पक्ष {days} दिन का लिखित नोटिस देकर इस अनुबंध को समाप्त कर सकता है।"),
+    ("क्षेत्राधिकार", "किसी भी कानूनी विवाद का निपटारा {city} की अदालतों में किया जाएगा।"),
+]
+
+DEVANAGARI_DIGITS = str.maketrans("0123456789", "०१२३४५६७८९")
+
+def generate_synthetic_contract(n_clauses, seed=0, hindi=False):
+    """Builds a numbered contract with n_clauses clauses, deterministic for a given seed."""
+    rng = random.Random(f"{seed}-{n_clauses}-{hindi}")
+    first, second = rng.choice(SYNTHETIC_PARTIES)
+    library = SYNTHETIC_CLAUSES_HI if hindi else SYNTHETIC_CLAUSES
+    if hindi:
+        lines = ["किराया अनुबंध", "", f"यह अनुबंध १ जनवरी २०२६ को {first} और {second} के बीच किया गया है।"]
+    else:
+        lines = ["SERVICE AGREEMENT", "",
+                 f"This Agreement is made on January 1, 2026, between {first} (Client) and {second} (Service Provider)."]
+
+    for i in range(1, n_clauses + 1):
+        header, body = rng.choice(library)
+        body = body.format(
+            n=i, day=rng.randint(1, 10), days=rng.choice([7, 15, 30, 60, 90]), months=rng.choice([6, 11, 12, 24]),
+            percent=rng.choice([2, 5, 10]), amount=f"{rng.randint(1, 500) * 1000:,}", city=rng.choice(SYNTHETIC_CITIES)
+        )
+        number = str(i).translate(DEVANAGARI_DIGITS) if hindi else str(i)
+        lines += ["", f"{number}. {header}", body]
+    return "\n".join(lines) + "\n"
+
+def write_synthetic_corpus(out_dir, sizes=(10, 100, 1000), seed=0, hindi=False):
+    """Writes one synthetic .txt contract per clause count and returns their paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for size in sizes:
+        path = os.path.join(out_dir, f"synthetic_{'hi' if hindi else 'en'}_{size}.txt")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(generate_synthetic_contract(size, seed=seed, hindi=hindi))
+        paths.append(path)
+    return paths
+
+def generate_samples():
     print("Generating sample PDFs...")
     create_pdf("employment_sample.pdf", "Employment Agreement", employment_content)
     create_pdf("vendor_sample.pdf", "Vendor Agreement", vendor_content)
@@ -143,3 +211,17 @@ Any legal disputes shall be settled in the courts of Delhi.
         f.write(hindi_content)
         
     print("Samples generated in 'samples/' directory.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate sample contracts.")
+    parser.add_argument("--synthetic", type=int, nargs="+", metavar="CLAUSES",
+                        help="Write synthetic .txt contracts with these clause counts instead of the samples")
+    parser.add_argument("--hindi", action="store_true", help="Synthetic contracts in Hindi")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--out", default="samples/synthetic")
+    args = parser.parse_args()
+    if args.synthetic:
+        for path in write_synthetic_corpus(args.out, args.synthetic, seed=args.seed, hindi=args.hindi):
+            print(f"Wrote {path}")
+    else:
+        generate_samples()
@@ -0,0 +1,18 @@
+"""Re-embeds the clause index with the current embedder, e.g. after switching spaCy models.
+
+Stop the app, API server and batch runs first; they refuse an index built with another embedder.
+
+Usage:
+    python reindex_clauses.py
+"""
+import os
+import sys
+
+# Add src to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from src.data.clause_index import ClauseIndex
+
+if __name__ == "__main__":
+    index = ClauseIndex(allow_embedder_change=True)
+    print(f"Re-embedded {index.reembed()} clauses with {index.embedder_name}")
@@ -0,0 +1,67 @@
+import os
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Optional
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
+from fastapi.responses import JSONResponse
+from src.config import API_UPLOAD_DIR
+from src.pipeline.jobs import AnalysisJobQueue, QueueFullError
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.txt')
+# Upper bound on a single long-poll so idle connections don't pile up
+MAX_WAIT_SECONDS = 60.0
+
+def _public(job: Dict[str, Any], include_result: bool = True) -> Dict[str, Any]:
+    view = dict(job)
+    if not include_result:
+        view.pop("result", None)
+    return view
+
+def create_app(job_queue: Optional[AnalysisJobQueue] = None) -> FastAPI:
+    """Builds the analysis API around an in-process job queue."""
+    jobs = job_queue or AnalysisJobQueue()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await jobs.start()
+        yield
+        await jobs.stop()
+
+    app = FastAPI(title="LegalAssist AI Analysis API", lifespan=lifespan)
+    app.state.jobs = jobs
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "jobs": jobs.stats()}
+
+    @app.post("/jobs", status_code=202)
+    async def submit_job(file: UploadFile = File(...), force: bool = Form(False)):
+        filename = os.path.basename(file.filename or "")
+        ext = os.path.splitext(filename)[1].lower()
+        if ext not in SUPPORTED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=f"Unsupported file format: {ext or 'none'}")
+
+        os.makedirs(API_UPLOAD_DIR, exist_ok=True)
+        path = os.path.join(API_UPLOAD_DIR, f"{uuid.uuid4().hex}{ext}")
+        with open(path, "wb") as f:
+            f.write(await file.read())
+
+        try:
+            job = jobs.submit(path, filename, force=force, cleanup=True)
+        except QueueFullError as e:
+            os.remove(path)
+            # Backpressure - callers should retry later instead of growing the backlog
+            return JSONResponse(status_code=503, content={"detail": str(e)}, headers={"Retry-After": "5"})
+        return _public(job, include_result=False)
+
+    @app.get("/jobs/{job_id}")
+    async def get_job(job_id: str, wait: float = 0.0):
+        """Returns a job; wait > 0 long-polls until it finishes or the wait elapses."""
+        if jobs.get(job_id) is None:
+            raise HTTPException(status_code=404, detail="Unknown job")
+        job = jobs.get(job_id)
+        if wait > 0 and job["status"] in ("queued", "running"):
+            job = await jobs.wait(job_id, min(wait, MAX_WAIT_SECONDS))
+        return _public(job)
+
+    return app
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+class SimulatedLatency:
+    """Seeded, thread-safe delay of base seconds plus up to +/- jitter (a fraction of base)."""
+
+    def __init__(self, base: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.base = max(0.0, base)
+        self.jitter = max(0.0, jitter)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self) -> float:
+        if self.base <= 0:
+            return 0.0
+        with self._lock:
+            delay = self.base * (1 + self._rng.uniform(-self.jitter, self.jitter))
+        time.sleep(delay)
+        return delay
+
+def _pick(options: List[Any], text: str) -> Any:
+    """Deterministic choice keyed on the text, independent of call order and threads."""
+    digest = hashlib.sha1(text.encode("utf-8")).digest()
+    return options[digest[0] % len(options)]
+
+class _Completions:
+    def __init__(self, client: "MockOpenAIClient"):
+        self._client = client
+
+    def create(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Any:
+        return self._client.respond(model, messages, **kwargs)
+
+class MockOpenAIClient:
+    """Local stand-in for openai.OpenAI that answers chat completions for every pipeline prompt.
+
+    Answers are chosen from the prompt text alone, so runs are reproducible regardless
+    of thread scheduling. Each call sleeps for the simulated latency.
+    """
+
+    CLAUSE_MARKER = re.compile(r"\[Clause (\d+)\]")
+    CATEGORIES = ["Obligation", "Right", "Prohibition"]
+    RISK_LEVELS = ["Low", "Medium", "High"]
+    CONTRACT_TYPES = ["Employment Agreement", "Vendor Contract", "Lease Agreement", "Service Contract"]
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.latency = SimulatedLatency(latency, jitter, seed)
+        self.chat = SimpleNamespace(completions=_Completions(self))
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def _clause_result(self, text: str) -> Dict[str, Any]:
+        ambiguities = [{"term": "reasonable", "reason": "Not defined in the contract."}] if "reasonable" in text else []
+        return {
+            "category": _pick(self.CATEGORIES, text),
+            "explanation": "Simulated plain-language explanation of the clause.",
+            "risk_level": _pick(self.RISK_LEVELS, text[::-1]),
+            "ambiguities": ambiguities,
+        }
+
+    def _answer(self, system: str, prompt: str) -> Any:
+        if "classification" in system:
+            return _pick(self.CONTRACT_TYPES, prompt)
+        if "extracts structured data" in system:
+            return {
+                "Parties": ["First Party", "Second Party"],
+                "Effective Date": "January 1, 2026",
+                "Total Value/Financial Obligations": "INR 1,00,000",
+                "Termination Notice Period": "30 days",
+                "Governing Law/Jurisdiction": "India",
+            }
+        if "compliance" in system:
+            return {"issues": [{
+                "issue": "Stamp Duty Mention Missing",
+                "law": "Indian Stamp Act, 1899",
+                "risk": "Contract may be inadmissible as evidence in court.",
+                "recommendation": "Ensure appropriate stamp duty is paid and mentioned."
+            }]}
+        if "negotiator" in system:
+            return {"alternative": "Either party may terminate with 30 days written notice.",
+                    "explanation": "Simulated balanced alternative."}
+        if "risk analyst" in system:
+            return {"ambiguities": self._clause_result(prompt)["ambiguities"]}
+        ids = self.CLAUSE_MARKER.findall(prompt)
+        if ids:
+            # Batched clause analysis: one entry per numbered clause
+            chunks = self.CLAUSE_MARKER.split(prompt)[2::2]
+            return {"results": [dict(self._clause_result(chunk), id=int(i)) for i, chunk in zip(ids, chunks)]}
+        result = self._clause_result(prompt)
+        result.pop("ambiguities")
+        return result
+
+    def respond(self, model: str, messages: List[Dict[str, str]], **kwargs) -> Any:
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        prompt = next((m["content"] for m in messages if m["role"] == "user"), "")
+        answer = self._answer(system, prompt)
+        content = answer if isinstance(answer, str) else json.dumps(answer)
+        self.latency.wait()
+        with self._lock:
+            self.calls += 1
+        usage = SimpleNamespace(
+            prompt_tokens=sum(len(m["content"]) for m in messages) // 4 + 1,
+            completion_tokens=len(content) // 4 + 1
+        )
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(index=0, message=message)], usage=usage)
+
+class MockTranslator:
+    """Local stand-in for GoogleTranslator: one English line per input line, after a simulated delay.
+
+    Devanagari digits become ASCII and each Devanagari word becomes a fixed English
+    word, so clause numbering and line alignment survive "translation".
+    """
+
+    WORDS = ["the", "tenant", "shall", "pay", "rent", "deposit", "notice", "party", "agreement", "court", "month", "days"]
+    DEVANAGARI_WORD = re.compile(r"[ऀ-ॣ॰-ॿ]+")
+    DIGITS = str.maketrans("०१२३४५६७८९", "0123456789")
+
+    def __init__(self, source: str = "hi", target: str = "en", latency: float = 0.0,
+                 jitter: float = 0.0, seed: int = 0):
+        self.source = source
+        self.target = target
+        self.latency = SimulatedLatency(latency, jitter, seed)
+
+    def translate(self, text: Optional[str]) -> Optional[str]:
+        self.latency.wait()
+        if not text:
+            return text
+        text = text.translate(self.DIGITS)
+        return self.DEVANAGARI_WORD.sub(lambda m: _pick(self.WORDS, m.group()), text).replace("।", ".")
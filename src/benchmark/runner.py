@@ -0,0 +1,206 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+from src.config import BENCHMARK_BASELINE, BENCHMARK_CORPUS_DIR, BENCHMARK_TOLERANCE
+
+# Set before the case processes import src.config: every LLM call goes to the mock
+# and nothing is served from the memos, so each run does the full amount of work.
+MOCK_ENV = {
+    "OPENAI_API_KEY": "benchmark-mock",
+    "LLM_REQUESTS_PER_MINUTE": "0",
+    "LLM_TOKENS_PER_MINUTE": "0",
+    "LLM_MEMO_ENABLED": "false",
+    "TRANSLATION_MEMORY_ENABLED": "false",
+}
+
+# Differences below this many seconds are noise, whatever the relative change
+MIN_REGRESSION_SECONDS = 0.05
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+    except ImportError:
+        # Not available on Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+def _run_case(file_path: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Runs inside a fresh process so peak RSS belongs to this case alone."""
+    from src.benchmark.mocks import MockOpenAIClient, MockTranslator
+    from src.core import registry
+    from src.pipeline.analysis import AnalysisPipeline
+
+    registry.set_openai_client(MockOpenAIClient(settings["llm_latency"], settings["jitter"], settings["seed"]))
+    registry.set_translator_factory(lambda source, target: MockTranslator(
+        source, target, settings["translate_latency"], settings["jitter"], settings["seed"]))
+
+    started = time.perf_counter()
+    if settings["blank_spacy"]:
+        import spacy
+        registry.set_spacy_nlp(spacy.blank("en"))
+    # Building the pipeline loads the spaCy model, so startup is reported separately
+    pipeline = AnalysisPipeline(audit=False, cache=False, index=False)
+    startup_seconds = time.perf_counter() - started
+
+    runs = []
+    for _ in range(settings["repeat"]):
+        started = time.perf_counter()
+        results = pipeline.run(file_path, os.path.basename(file_path), force=True)
+        runs.append((time.perf_counter() - started, results))
+
+    seconds = [elapsed for elapsed, _ in runs]
+    median_run = sorted(runs, key=lambda run: run[0])[len(runs) // 2][1]
+    stage_names = {name for _, results in runs for name in results["trace"]["stages"]}
+    stages = {
+        name: round(statistics.median(
+            results["trace"]["stages"].get(name, {}).get("total_seconds", 0.0) for _, results in runs), 4)
+        for name in sorted(stage_names)
+    }
+    clauses = len(median_run["clauses"])
+    return {
+        "clauses": clauses,
+        "startup_seconds": round(startup_seconds, 3),
+        "seconds": round(statistics.median(seconds), 4),
+        "min_seconds": round(min(seconds), 4),
+        "clauses_per_second": round(clauses / statistics.median(seconds), 2) if clauses else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "llm_calls": median_run["trace"]["counters"].get("llm.calls", 0),
+        "stages": stages,
+    }
+
+class BenchmarkSuite:
+    """End-to-end pipeline benchmarks on synthetic contracts with a mocked LLM and translator.
+
+    Every case runs in its own process and reports median end-to-end latency, per-stage
+    time, throughput and peak RSS. Reports can be saved as the baseline and later runs
+    are compared against it.
+    """
+
+    def __init__(self, sizes: List[int] = (10, 100, 1000), hindi_sizes: List[int] = (100,),
+                 repeat: int = 3, llm_latency: float = 0.05, translate_latency: float = 0.02,
+                 jitter: float = 0.1, seed: int = 0, blank_spacy: bool = False,
+                 corpus_dir: str = BENCHMARK_CORPUS_DIR):
+        self.sizes = list(sizes)
+        self.hindi_sizes = list(hindi_sizes)
+        self.corpus_dir = corpus_dir
+        self.settings = {
+            "repeat": max(1, int(repeat)),
+            "llm_latency": llm_latency,
+            "translate_latency": translate_latency,
+            "jitter": jitter,
+            "seed": seed,
+            "blank_spacy": blank_spacy,
+        }
+
+    def build_corpus(self) -> Dict[str, str]:
+        """Writes the synthetic contracts and returns {case name: path}."""
+        from generate_samples import write_synthetic_corpus
+        cases = {}
+        for hindi, sizes in ((False, self.sizes), (True, self.hindi_sizes)):
+            paths = write_synthetic_corpus(self.corpus_dir, sizes, seed=self.settings["seed"], hindi=hindi)
+            for size, path in zip(sizes, paths):
+                cases[f"{'hi' if hindi else 'en'}-{size}"] = path
+        return cases
+
+    def run(self) -> Dict[str, Any]:
+        os.environ.update(MOCK_ENV)
+        from src.config import LLM_BATCH_MODE, CLAUSE_CONCURRENCY, SPACY_MODEL
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "settings": dict(self.settings, batch_mode=LLM_BATCH_MODE, clause_concurrency=CLAUSE_CONCURRENCY,
+                             spacy_model=SPACY_MODEL),
+            "cases": {},
+        }
+        # spawn, not fork: each case starts from a clean interpreter with the mock environment
+        context = multiprocessing.get_context("spawn")
+        for name, path in self.build_corpus().items():
+            print(f"Running {name}...", flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                report["cases"][name] = pool.submit(_run_case, path, self.settings).result()
+        return report
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = BENCHMARK_TOLERANCE) -> List[str]:
+    """Returns a message per case whose latency or peak RSS regressed beyond the tolerance."""
+    regressions = []
+    for name, current in report["cases"].items():
+        previous = baseline.get("cases", {}).get(name)
+        if not previous:
+            continue
+        if (current["seconds"] > previous["seconds"] * (1 + tolerance)
+                and current["seconds"] - previous["seconds"] > MIN_REGRESSION_SECONDS):
+            regressions.append(f"{name}: {previous['seconds']:.3f}s -> {current['seconds']:.3f}s")
+        if current.get("peak_rss_mb") and previous.get("peak_rss_mb") \
+                and current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {previous['peak_rss_mb']} MB -> {current['peak_rss_mb']} MB")
+    return regressions
+
+def format_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None) -> str:
+    lines = [f"{'case':<10}{'clauses':>9}{'seconds':>10}{'vs base':>9}{'clauses/s':>11}{'peak MB':>9}{'LLM calls':>11}"]
+    for name, case in report["cases"].items():
+        previous = (baseline or {}).get("cases", {}).get(name)
+        change = f"{(case['seconds'] / previous['seconds'] - 1) * 100:+.0f}%" if previous and previous["seconds"] else "-"
+        lines.append(f"{name:<10}{case['clauses']:>9}{case['seconds']:>10.3f}{change:>9}"
+                     f"{case['clauses_per_second']:>11.1f}{str(case['peak_rss_mb']):>9}{case['llm_calls']:>11.0f}")
+    lines.append("")
+    lines.append("Stage seconds (summed across worker threads):")
+    for name, case in report["cases"].items():
+        top = sorted(case["stages"].items(), key=lambda item: -item[1])[:6]
+        lines.append(f"  {name}: " + ", ".join(f"{stage} {seconds:.3f}" for stage, seconds in top))
+    return "\n".join(lines)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the analysis pipeline against a mocked LLM and translator.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[10, 100, 1000], help="English contract clause counts")
+    parser.add_argument("--hindi-sizes", type=int, nargs="*", default=[100], help="Hindi contract clause counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the median is reported")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Simulated seconds per LLM call")
+    parser.add_argument("--translate-latency", type=float, default=0.02, help="Simulated seconds per translation request")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Latency jitter as a fraction of the base")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blank-spacy", action="store_true", help="Use a blank spaCy pipeline (no model download)")
+    parser.add_argument("--baseline", default=BENCHMARK_BASELINE, help="Baseline report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE, help="Allowed relative regression")
+    parser.add_argument("-o", "--output", help="Also write the report to this JSON file")
+    args = parser.parse_args(argv)
+
+    suite = BenchmarkSuite(args.sizes, args.hindi_sizes, args.repeat, args.llm_latency,
+                           args.translate_latency, args.jitter, args.seed, args.blank_spacy)
+    report = suite.run()
+
+    baseline = None
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+    if baseline is None:
+        print("No baseline found; run with --save-baseline to create one.")
+        return 0
+
+    if baseline.get("settings") != report["settings"]:
+        print("Warning: baseline was recorded with different settings; comparison may be misleading.")
+    regressions = compare(report, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    return 1 if regressions else 0
@@ -10,13 +10,142 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 # Model Configuration
 LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4")
 
+# spaCy Configuration
+# en_core_web_sm / md / lg (or just sm / md / lg): smaller models load and run faster, lg is the most accurate
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_lg")
+if SPACY_MODEL in ("sm", "md", "lg"):
+    SPACY_MODEL = f"en_core_web_{SPACY_MODEL}"
+# Load only the components named entity recognition needs (no parser, tagger or lemmatizer)
+SPACY_NER_ONLY = os.getenv("SPACY_NER_ONLY", "true").lower() == "true"
+# Documents are fed to nlp.pipe in paragraph chunks of at most this many characters
+SPACY_CHUNK_CHARS = int(os.getenv("SPACY_CHUNK_CHARS", "5000"))
+SPACY_BATCH_SIZE = int(os.getenv("SPACY_BATCH_SIZE", "32"))
+# Worker processes for nlp.pipe; only pays off for very long documents
+SPACY_N_PROCESS = int(os.getenv("SPACY_N_PROCESS", "1"))
+# Also return the raw spaCy entities; when off, spaCy only runs if the LLM can't answer
+ENTITY_INCLUDE_SPACY = os.getenv("ENTITY_INCLUDE_SPACY", "true").lower() == "true"
+# Fill structured fields with the rule-based extractor first; the LLM only gets the fields it missed
+ENTITY_RULES_PREPASS = os.getenv("ENTITY_RULES_PREPASS", "true").lower() == "true"
+
+# LLM Gateway Configuration
+# Client-side throttling below the provider's limits (0 = unlimited); limits are per
+# process, and batch runs split them evenly across their BATCH_WORKERS processes
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "500"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "30000"))
+# Retries for 429s, timeouts, connection errors and 5xx, with jittered exponential backoff
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30"))
+# Consecutive failed calls before switching to heuristics, and how long to stay switched
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "60"))
+
+# Prompt Budget Configuration
+# Tokens of document text sent per request for each stage, filled with the most relevant sections
+PROMPT_TOKEN_BUDGETS = {
+    "classification": int(os.getenv("PROMPT_BUDGET_CLASSIFICATION", "500")),
+    "entities": int(os.getenv("PROMPT_BUDGET_ENTITIES", "750")),
+    "compliance": int(os.getenv("PROMPT_BUDGET_COMPLIANCE", "1250")),
+    "clause": int(os.getenv("PROMPT_BUDGET_CLAUSE", "1500")),
+}
+# Context window per model; budgets are capped so prompts never overflow it
+MODEL_CONTEXT_TOKENS = {
+    "gpt-4": 8192,
+    "gpt-4-turbo": 128000,
+    "gpt-4o": 128000,
+    "gpt-4o-mini": 128000,
+    "gpt-3.5-turbo": 16385,
+}
+DEFAULT_CONTEXT_TOKENS = int(os.getenv("DEFAULT_CONTEXT_TOKENS", "8192"))
+# Tokens kept free for the model's answer
+PROMPT_OUTPUT_RESERVE = int(os.getenv("PROMPT_OUTPUT_RESERVE", "1024"))
+
+# Concurrency Configuration
+# Maximum number of clauses analysed in parallel (1 = serial)
+CLAUSE_CONCURRENCY = int(os.getenv("CLAUSE_CONCURRENCY", "8"))
+# Size of the shared keep-alive connection pool used by the OpenAI client
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+
+# PDF Extraction Configuration
+# Worker processes for page-parallel PDF extraction (1 = serial)
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "1"))
+# PDFs with fewer pages than this are always parsed serially
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "20"))
+
+# Translation Configuration
+# Google Translate rejects requests above ~5000 characters
+TRANSLATION_CHUNK_CHARS = int(os.getenv("TRANSLATION_CHUNK_CHARS", "4500"))
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "4"))
+TRANSLATION_RETRIES = int(os.getenv("TRANSLATION_RETRIES", "2"))
+
+# Batched LLM Configuration
+# When enabled, several clauses are analysed per chat-completions request
+LLM_BATCH_MODE = os.getenv("LLM_BATCH_MODE", "false").lower() == "true"
+LLM_BATCH_SIZE = int(os.getenv("LLM_BATCH_SIZE", "10"))
+LLM_BATCH_TOKEN_BUDGET = int(os.getenv("LLM_BATCH_TOKEN_BUDGET", "3000"))
+
+# Headless Batch Configuration
+# Worker processes used by batch_analyze.py (each loads its own models)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", "2"))
+
+# Analysis API Configuration
+API_HOST = os.getenv("API_HOST", "0.0.0.0")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+# Jobs analysed at the same time by the in-process worker pool
+API_WORKERS = int(os.getenv("API_WORKERS", "2"))
+# Pending jobs accepted before new submissions are rejected with 503
+API_QUEUE_SIZE = int(os.getenv("API_QUEUE_SIZE", "100"))
+# Finished jobs are kept this long for polling, then forgotten
+API_JOB_TTL_SECONDS = int(os.getenv("API_JOB_TTL_SECONDS", "3600"))
+
 # Path Configuration
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 STORAGE_DIR = os.path.join(DATA_DIR, "storage")
 TEMPLATE_DIR = os.path.join(DATA_DIR, "templates")
 LOG_DIR = os.path.join(BASE_DIR, "logs")
+# Legacy JSON-array audit log, migrated into AUDIT_DB on first use
 LOG_FILE = os.path.join(LOG_DIR, "audit.json")
+AUDIT_DB = os.path.join(LOG_DIR, "audit.db")
+API_UPLOAD_DIR = os.path.join(STORAGE_DIR, "uploads")
+
+# Result Cache Configuration
+# Bump PIPELINE_VERSION whenever analysis output changes so stale cached results are ignored
+PIPELINE_VERSION = "6"
+RESULT_CACHE_DIR = os.path.join(STORAGE_DIR, "cache", "results")
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "200"))
+RESULT_CACHE_MAX_AGE_DAYS = float(os.getenv("RESULT_CACHE_MAX_AGE_DAYS", "30"))
+
+# LLM Response Memo Configuration
+LLM_MEMO_ENABLED = os.getenv("LLM_MEMO_ENABLED", "true").lower() == "true"
+LLM_MEMO_DB = os.path.join(STORAGE_DIR, "cache", "llm_memo.sqlite")
+LLM_MEMO_MAX_ENTRIES = int(os.getenv("LLM_MEMO_MAX_ENTRIES", "50000"))
+
+# Translation Memory Configuration
+TRANSLATION_MEMORY_ENABLED = os.getenv("TRANSLATION_MEMORY_ENABLED", "true").lower() == "true"
+TRANSLATION_MEMORY_DB = os.path.join(STORAGE_DIR, "cache", "translation_memory.sqlite")
+
+# Clause Index Configuration
+# Every analysed clause is stored with its embedding for semantic search
+CLAUSE_INDEX_ENABLED = os.getenv("CLAUSE_INDEX_ENABLED", "true").lower() == "true"
+CLAUSE_INDEX_DB = os.path.join(STORAGE_DIR, "index", "clauses.sqlite")
+CLAUSE_INDEX_SNAPSHOT = os.path.join(STORAGE_DIR, "index", "vectors.npz")
+# Feature-hashing dimension, used when the spaCy model has no word vectors
+CLAUSE_EMBEDDING_DIM = int(os.getenv("CLAUSE_EMBEDDING_DIM", "256"))
+# Below this many clauses search is exact; above it an IVF index is trained
+CLAUSE_INDEX_TRAIN_SIZE = int(os.getenv("CLAUSE_INDEX_TRAIN_SIZE", "50000"))
+# IVF lists scanned per query: higher is more accurate and slower
+CLAUSE_INDEX_NPROBE = int(os.getenv("CLAUSE_INDEX_NPROBE", "16"))
+# Filtered searches matching at most this many clauses are exact
+CLAUSE_INDEX_EXACT_LIMIT = int(os.getenv("CLAUSE_INDEX_EXACT_LIMIT", "20000"))
+
+# Benchmark Configuration
+# Not shipped - timings are machine-specific, so record one with `python benchmark.py --save-baseline`;
+# generated corpora live under storage
+BENCHMARK_BASELINE = os.path.join(DATA_DIR, "benchmarks", "baseline.json")
+BENCHMARK_CORPUS_DIR = os.path.join(STORAGE_DIR, "benchmarks", "corpus")
+# Relative slowdown (or memory growth) over the baseline reported as a regression
+BENCHMARK_TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "0.25"))
 
 # Ensure directories exist
 os.makedirs(STORAGE_DIR, exist_ok=True)
@@ -0,0 +1,233 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from src.core.tracing import incr, span
+from src.config import (
+    OPENAI_API_KEY, LLM_MODEL, PROMPT_OUTPUT_RESERVE, LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE,
+    LLM_MAX_RETRIES, LLM_BACKOFF_BASE, LLM_BACKOFF_MAX, LLM_BREAKER_THRESHOLD, LLM_BREAKER_COOLDOWN
+)
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the LLM while the circuit breaker is open."""
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at per_minute units per minute (0 = unlimited)."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self._tokens = self.capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Blocks until amount units are available and returns the seconds spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        # A single oversized request must still get through eventually
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def refund(self, amount: float):
+        """Returns over-reserved units once the real usage is known."""
+        if self.rate <= 0 or amount <= 0:
+            return
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single trial call through after a cooldown."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_THRESHOLD, cooldown: float = LLM_BREAKER_COOLDOWN,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self._clock = clock
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._state = self.CLOSED
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and self._clock() - self._opened_at >= self.cooldown:
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; in half-open state only one trial call is admitted."""
+        state = self.state
+        with self._lock:
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """Frees a half-open trial slot without judging the endpoint's health."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+class LLMGateway:
+    """Single entry point for chat completions: rate limiting, retries, circuit breaking and metrics.
+
+    Requests and tokens per minute are throttled client-side before provider limits are
+    hit. Transient errors (429, timeouts, connection drops, 5xx) are retried with jittered
+    exponential backoff. Repeated failures open the circuit breaker, and callers then fall
+    back to heuristics without waiting on a dead endpoint.
+    """
+
+    def __init__(self, client_factory: Optional[Callable[[], Any]] = None, model: str = LLM_MODEL,
+                 requests_per_minute: float = LLM_REQUESTS_PER_MINUTE, tokens_per_minute: float = LLM_TOKENS_PER_MINUTE,
+                 max_retries: int = LLM_MAX_RETRIES, backoff_base: float = LLM_BACKOFF_BASE,
+                 backoff_max: float = LLM_BACKOFF_MAX, breaker: Optional[CircuitBreaker] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        if client_factory is None:
+            from src.core.registry import get_openai_client
+            client_factory = get_openai_client
+        from src.core.prompt_builder import PromptBuilder
+        self.client_factory = client_factory
+        self.model = model
+        self.request_bucket = TokenBucket(requests_per_minute, sleep=sleep)
+        self.token_bucket = TokenBucket(tokens_per_minute, sleep=sleep)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.prompt_builder = PromptBuilder(model)
+        self._sleep = sleep
+        self._metrics: Dict[str, Dict[str, float]] = {}
+        self._metrics_lock = threading.Lock()
+
+    def is_available(self) -> bool:
+        """False without an API key or while the breaker is open - callers use heuristics instead."""
+        return bool(OPENAI_API_KEY) and self.breaker.state != CircuitBreaker.OPEN
+
+    @staticmethod
+    def _retryable_errors() -> tuple:
+        import openai
+        return (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError, openai.InternalServerError)
+
+    def backoff_delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than a server-sent Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        try:
+            delay = max(delay, min(float(retry_after), self.backoff_max))
+        except (TypeError, ValueError):
+            pass
+        return delay
+
+    def _record(self, name: str, **values: float):
+        with self._metrics_lock:
+            entry = self._metrics.setdefault(name, {
+                "calls": 0, "failures": 0, "retries": 0, "latency_total": 0.0, "latency_max": 0.0,
+                "prompt_tokens": 0, "completion_tokens": 0, "throttle_seconds": 0.0
+            })
+            for key, value in values.items():
+                if key == "latency":
+                    entry["latency_total"] += value
+                    entry["latency_max"] = max(entry["latency_max"], value)
+                else:
+                    entry[key] += value
+
+    def chat(self, name: str, messages: List[Dict[str, str]], **kwargs) -> Any:
+        """Sends a chat completion for the named stage; raises if it ultimately fails."""
+        with span(f"llm.{name}"):
+            return self._chat(name, messages, **kwargs)
+
+    def _chat(self, name: str, messages: List[Dict[str, str]], **kwargs) -> Any:
+        if not self.breaker.allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        estimate = sum(self.prompt_builder.count_tokens(m["content"]) for m in messages)
+        estimate += kwargs.get("max_tokens", PROMPT_OUTPUT_RESERVE)
+        self._record(name, calls=1, throttle_seconds=self.token_bucket.acquire(estimate))
+
+        retryable = self._retryable_errors()
+        attempt = 0
+        while True:
+            # Every attempt, retries included, counts against the provider's request limit
+            self._record(name, throttle_seconds=self.request_bucket.acquire(1))
+            started = time.perf_counter()
+            try:
+                response = self.client_factory().chat.completions.create(model=self.model, messages=messages, **kwargs)
+            except retryable as e:
+                self._record(name, latency=time.perf_counter() - started)
+                if attempt >= self.max_retries:
+                    self._record(name, failures=1)
+                    self.breaker.record_failure()
+                    raise
+                self._record(name, retries=1)
+                incr("llm.retries")
+                self._sleep(self.backoff_delay(attempt, e))
+                attempt += 1
+                continue
+            except Exception:
+                # Bad requests are the caller's problem, not an outage - leave the breaker alone
+                self._record(name, failures=1, latency=time.perf_counter() - started)
+                self.breaker.release()
+                raise
+
+            self.breaker.record_success()
+            usage = getattr(response, "usage", None)
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            if usage is not None:
+                self.token_bucket.refund(estimate - prompt_tokens - completion_tokens)
+            self._record(name, latency=time.perf_counter() - started,
+                         prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+            incr("llm.calls")
+            incr("llm.prompt_tokens", prompt_tokens)
+            incr("llm.completion_tokens", completion_tokens)
+            return response
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Per-stage call counts, failures, retries, latency (seconds) and token usage."""
+        with self._metrics_lock:
+            snapshot = {name: dict(entry) for name, entry in self._metrics.items()}
+        for entry in snapshot.values():
+            attempts = entry["calls"] + entry["retries"]
+            entry["latency_avg"] = round(entry["latency_total"] / attempts, 3) if attempts else 0.0
+        return snapshot
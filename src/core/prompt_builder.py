@@ -0,0 +1,114 @@
+from typing import List, Optional
+from src.config import (
+    LLM_MODEL, PROMPT_TOKEN_BUDGETS, MODEL_CONTEXT_TOKENS,
+    DEFAULT_CONTEXT_TOKENS, PROMPT_OUTPUT_RESERVE
+)
+from src.core.registry import get_tokenizer
+from src.nlp.keyword_matcher import KeywordMatcher
+
+class PromptBuilder:
+    """Fits document text into a per-stage token budget, capped by the model's context window.
+
+    Tokens are counted locally with tiktoken when it is available (~4 characters per
+    token otherwise). Documents over budget are reduced to their opening section plus
+    the sections with the most keyword hits, instead of their first N characters.
+    """
+
+    GAP_MARKER = "\n[...]\n"
+    # Don't bother squeezing a truncated section into less room than this
+    MIN_PARTIAL_TOKENS = 64
+
+    def __init__(self, model: str = LLM_MODEL):
+        self.model = model
+        self.encoder = get_tokenizer(model)
+
+    def count_tokens(self, text: str) -> int:
+        if self.encoder is not None:
+            return len(self.encoder.encode(text, disallowed_special=()))
+        # Rough estimate (~4 characters per token for English)
+        return len(text) // 4 + 1
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cuts text to at most max_tokens, ending on a word boundary where possible."""
+        if max_tokens <= 0:
+            return ""
+        if self.count_tokens(text) <= max_tokens:
+            return text
+        if self.encoder is not None:
+            tokens = self.encoder.encode(text, disallowed_special=())[:max_tokens]
+            # A multi-byte character split across the cut decodes to U+FFFD
+            cut = self.encoder.decode(tokens).rstrip("\ufffd")
+        else:
+            cut = text[:(max_tokens - 1) * 4]
+        boundary = max(cut.rfind(" "), cut.rfind("\n"))
+        if boundary > len(cut) // 2:
+            cut = cut[:boundary]
+        return cut.rstrip()
+
+    def context_window(self) -> int:
+        """Context size of the configured model, matching dated variants by prefix."""
+        matches = [name for name in MODEL_CONTEXT_TOKENS if self.model == name or self.model.startswith(name + "-")]
+        if not matches:
+            return DEFAULT_CONTEXT_TOKENS
+        return MODEL_CONTEXT_TOKENS[max(matches, key=len)]
+
+    def budget(self, stage: str, template: str = "") -> int:
+        """Tokens available for document text in a stage's prompt."""
+        room = self.context_window() - PROMPT_OUTPUT_RESERVE - self.count_tokens(template)
+        return max(0, min(PROMPT_TOKEN_BUDGETS[stage], room))
+
+    @staticmethod
+    def split_sections(text: str) -> List[str]:
+        """Splits a document into clause-sized sections, or lines if no headers are found."""
+        from src.parsers.clause_extractor import ClauseExtractor
+        sections = [text[c["start"]:c["end"]] for c in ClauseExtractor().extract_clauses(text)]
+        if len(sections) < 2:
+            sections = text.split("\n")
+        return [s.strip() for s in sections if s.strip()]
+
+    def select_sections(self, sections: List[str], max_tokens: int,
+                        matcher: Optional[KeywordMatcher] = None, keep_head: bool = True) -> str:
+        """Packs the most relevant sections into max_tokens, keeping document order."""
+        if not sections or max_tokens <= 0:
+            return ""
+        sections = list(sections)
+        if keep_head and self.count_tokens(sections[0]) > max_tokens // 2:
+            # Leave at least half the budget for relevant sections further down
+            sections[0] = self.truncate(sections[0], max_tokens // 2)
+
+        scores = [len(matcher.find_all(s)) if matcher else 0 for s in sections]
+        order = [0] if keep_head else []
+        order += sorted((i for i in range(len(sections)) if scores[i] and i not in order),
+                        key=lambda i: (-scores[i], i))
+        # Remaining budget goes to the rest of the document in reading order
+        ranked = set(order)
+        order += [i for i in range(len(sections)) if i not in ranked]
+
+        gap_cost = self.count_tokens(self.GAP_MARKER)
+        chosen = {}
+        used = 0
+        for i in order:
+            cost = self.count_tokens(sections[i]) + gap_cost
+            if used + cost <= max_tokens:
+                chosen[i] = sections[i]
+                used += cost
+            elif scores[i] and max_tokens - used - gap_cost >= self.MIN_PARTIAL_TOKENS:
+                chosen[i] = self.truncate(sections[i], max_tokens - used - gap_cost)
+                used = max_tokens
+
+        parts = []
+        previous = -1
+        for i in sorted(chosen):
+            if parts:
+                parts.append("\n" if i == previous + 1 else self.GAP_MARKER)
+            parts.append(chosen[i])
+            previous = i
+        return self.truncate("".join(parts), max_tokens)
+
+    def fit(self, stage: str, text: str, template: str = "",
+            matcher: Optional[KeywordMatcher] = None, keep_head: bool = True) -> str:
+        """Returns text unchanged if it fits the stage budget, else its most relevant sections."""
+        budget = self.budget(stage, template)
+        if self.count_tokens(text) <= budget:
+            return text
+        return self.select_sections(self.split_sections(text), budget, matcher, keep_head)
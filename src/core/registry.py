@@ -0,0 +1,204 @@
+import os
+import threading
+from typing import Any, Dict, Tuple
+from src.config import OPENAI_API_KEY, OPENAI_MAX_CONNECTIONS, SPACY_MODEL, SPACY_NER_ONLY
+
+# Process-wide singletons. Every component asks the registry for its heavy
+# resources instead of building them, so only the first request pays the load cost.
+_spacy_lock = threading.Lock()
+_spacy_models: Dict[Tuple[str, bool], Any] = {}
+# Components entity recognition doesn't use; names a model doesn't have are ignored
+_NON_NER_COMPONENTS = ["tagger", "morphologizer", "parser", "senter", "attribute_ruler", "lemmatizer"]
+
+_openai_lock = threading.Lock()
+_openai_client = None
+
+# deep-translator instances mutate their request params on every call,
+# so each thread gets its own instance rather than sharing one.
+_translator_local = threading.local()
+# Builds translators instead of GoogleTranslator when set (benchmarks, offline runs)
+_translator_factory = None
+
+_memo_lock = threading.Lock()
+_llm_memo = None
+
+_tm_lock = threading.Lock()
+_translation_memory = None
+
+_gateway_lock = threading.Lock()
+_llm_gateway = None
+
+_clause_index_lock = threading.Lock()
+_clause_index = None
+
+_tokenizer_lock = threading.Lock()
+_tokenizers: Dict[str, Any] = {}
+
+_preload_lock = threading.Lock()
+_preload_started = False
+
+def _load_spacy(model_name: str, ner_only: bool = False):
+    """Loads a spaCy pipeline, downloading it on first use if missing."""
+    import spacy
+    # Excluded components are never loaded, which saves memory as well as time
+    exclude = _NON_NER_COMPONENTS if ner_only else []
+    try:
+        nlp = spacy.load(model_name, exclude=exclude)
+    except OSError:
+        # Fallback if model not downloaded
+        os.system(f"python -m spacy download {model_name}")
+        nlp = spacy.load(model_name, exclude=exclude)
+    if ner_only and "tok2vec" in nlp.pipe_names and "ner" in nlp.pipe_names:
+        # The shared tok2vec only feeds the excluded components unless NER listens to it
+        if "ner" not in getattr(nlp.get_pipe("tok2vec"), "listening_components", ["ner"]):
+            nlp.remove_pipe("tok2vec")
+    return nlp
+
+def get_spacy_nlp(model_name: str = SPACY_MODEL, ner_only: bool = SPACY_NER_ONLY):
+    """Returns the shared spaCy pipeline, loading it once per process."""
+    key = (model_name, ner_only)
+    nlp = _spacy_models.get(key)
+    if nlp is None:
+        with _spacy_lock:
+            nlp = _spacy_models.get(key)
+            if nlp is None:
+                nlp = _load_spacy(model_name, ner_only)
+                _spacy_models[key] = nlp
+    return nlp
+
+def set_spacy_nlp(nlp, model_name: str = SPACY_MODEL, ner_only: bool = SPACY_NER_ONLY):
+    """Registers an already-built spaCy pipeline in place of a model, e.g. a blank one offline."""
+    with _spacy_lock:
+        _spacy_models[(model_name, ner_only)] = nlp
+
+def get_openai_client():
+    """Returns the shared OpenAI client with a pooled keep-alive HTTP transport."""
+    global _openai_client
+    if _openai_client is None:
+        with _openai_lock:
+            if _openai_client is None:
+                import httpx
+                import openai
+                limits = httpx.Limits(
+                    max_connections=OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=OPENAI_MAX_CONNECTIONS
+                )
+                _openai_client = openai.OpenAI(
+                    api_key=OPENAI_API_KEY,
+                    http_client=openai.DefaultHttpxClient(limits=limits),
+                    # Retries are handled by the LLM gateway so backoff and rate limits stay in one place
+                    max_retries=0
+                )
+    return _openai_client
+
+def set_openai_client(client):
+    """Replaces the shared OpenAI client, e.g. with a local stand-in for benchmarks."""
+    global _openai_client
+    with _openai_lock:
+        _openai_client = client
+
+def get_llm_gateway():
+    """Returns the shared gateway every LLM call goes through."""
+    global _llm_gateway
+    if _llm_gateway is None:
+        with _gateway_lock:
+            if _llm_gateway is None:
+                from src.core.llm_gateway import LLMGateway
+                _llm_gateway = LLMGateway()
+    return _llm_gateway
+
+def set_llm_gateway(gateway):
+    """Replaces the shared gateway, e.g. with one that has a share of the rate limits."""
+    global _llm_gateway
+    with _gateway_lock:
+        _llm_gateway = gateway
+
+def get_translator(source: str = "hi", target: str = "en"):
+    """Returns the calling thread's GoogleTranslator for a language pair."""
+    cache: Dict[Tuple[str, str], Any] = getattr(_translator_local, "translators", None)
+    if cache is None:
+        cache = _translator_local.translators = {}
+    translator = cache.get((source, target))
+    if translator is None:
+        if _translator_factory is not None:
+            translator = cache[(source, target)] = _translator_factory(source, target)
+        else:
+            from deep_translator import GoogleTranslator
+            translator = cache[(source, target)] = GoogleTranslator(source=source, target=target)
+    return translator
+
+def set_translator_factory(factory):
+    """Builds translators with factory(source, target) instead of GoogleTranslator; None restores it.
+
+    Call before the first translation - threads keep the instances they already built.
+    """
+    global _translator_factory
+    _translator_factory = factory
+
+def get_llm_memo():
+    """Returns the shared clause-level LLM response memo."""
+    global _llm_memo
+    if _llm_memo is None:
+        with _memo_lock:
+            if _llm_memo is None:
+                from src.data.llm_memo import LLMMemo
+                _llm_memo = LLMMemo()
+    return _llm_memo
+
+def get_translation_memory():
+    """Returns the shared segment-level translation memory."""
+    global _translation_memory
+    if _translation_memory is None:
+        with _tm_lock:
+            if _translation_memory is None:
+                from src.multilingual.translation_memory import TranslationMemory
+                _translation_memory = TranslationMemory()
+    return _translation_memory
+
+def get_clause_index():
+    """Returns the shared semantic clause index, or None if its store belongs to another embedder."""
+    global _clause_index
+    if _clause_index is None:
+        with _clause_index_lock:
+            if _clause_index is None:
+                from src.data.clause_index import ClauseIndex
+                try:
+                    _clause_index = ClauseIndex()
+                except ValueError as e:
+                    print(f"Clause index disabled: {e}")
+    return _clause_index
+
+def get_tokenizer(model: str):
+    """Returns the shared tiktoken encoding for a model, or None if tiktoken is unavailable."""
+    if model in _tokenizers:
+        return _tokenizers[model]
+    with _tokenizer_lock:
+        if model not in _tokenizers:
+            encoder = None
+            try:
+                import tiktoken
+                try:
+                    encoder = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    encoder = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                # Not installed or the encoding can't be fetched - callers fall back to estimates
+                print(f"Tokenizer unavailable, estimating tokens: {e}")
+            _tokenizers[model] = encoder
+    return _tokenizers[model]
+
+def preload(model_name: str = SPACY_MODEL):
+    """Starts loading the spaCy pipeline in the background, once per process."""
+    global _preload_started
+    with _preload_lock:
+        if _preload_started:
+            return
+        _preload_started = True
+
+    def _warm():
+        try:
+            get_spacy_nlp(model_name)
+        except Exception as e:
+            print(f"spaCy preload error: {e}")
+
+    threading.Thread(target=_warm, name="spacy-preload", daemon=True).start()
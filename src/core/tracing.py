@@ -0,0 +1,135 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# (trace, parent span id) for the code currently running. ClauseExecutor copies the
+# context into its worker threads, so spans opened there nest under the submitting stage.
+_active: ContextVar[Optional[Tuple["Trace", Optional[int]]]] = ContextVar("active_trace", default=None)
+
+class Trace:
+    """Timed spans and counters collected while analysing one contract."""
+
+    # Keeps traces of very long contracts bounded; extra spans are only counted
+    MAX_SPANS = 10000
+
+    def __init__(self, name: str = "analysis"):
+        self.name = name
+        self.spans = []
+        self.counters: Dict[str, float] = {}
+        self._origin = time.perf_counter()
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[None]:
+        """Times the enclosed block and makes this trace current inside it."""
+        parent = _active.get()
+        with self._lock:
+            span_id = self._next_id
+            self._next_id += 1
+        token = _active.set((self, span_id))
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - started
+            _active.reset(token)
+            record = {
+                "id": span_id,
+                "parent": parent[1] if parent and parent[0] is self else None,
+                "name": name,
+                "start": round(started - self._origin, 6),
+                "duration": round(duration, 6),
+                "thread": threading.current_thread().name,
+            }
+            if attrs:
+                record["args"] = attrs
+            with self._lock:
+                if len(self.spans) < self.MAX_SPANS:
+                    self.spans.append(record)
+                else:
+                    self.counters["trace.dropped_spans"] = self.counters.get("trace.dropped_spans", 0) + 1
+
+    def bind(self, func: Callable, name: Optional[str] = None) -> Callable:
+        """Wraps func so each call runs (optionally in a named span) with this trace current."""
+        parent = _active.get()
+        parent_id = parent[1] if parent and parent[0] is self else None
+
+        def wrapper(*args, **kwargs):
+            token = _active.set((self, parent_id))
+            try:
+                if name is None:
+                    return func(*args, **kwargs)
+                with self.span(name):
+                    return func(*args, **kwargs)
+            finally:
+                _active.reset(token)
+        return wrapper
+
+    def incr(self, counter: str, amount: float = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable trace with per-stage totals, counters and the raw spans."""
+        with self._lock:
+            spans = list(self.spans)
+            counters = dict(self.counters)
+        stages: Dict[str, Dict[str, float]] = {}
+        for record in spans:
+            stage = stages.setdefault(record["name"], {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stage["count"] += 1
+            stage["total_seconds"] += record["duration"]
+            stage["max_seconds"] = max(stage["max_seconds"], record["duration"])
+        for stage in stages.values():
+            stage["total_seconds"] = round(stage["total_seconds"], 6)
+        return {
+            "name": self.name,
+            "total_seconds": round(time.perf_counter() - self._origin, 6),
+            "stages": stages,
+            "counters": counters,
+            "spans": spans,
+        }
+
+def current_trace() -> Optional[Trace]:
+    active = _active.get()
+    return active[0] if active else None
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[None]:
+    """Records a span on the current trace; does nothing outside a traced analysis."""
+    trace = current_trace()
+    if trace is None:
+        yield
+        return
+    with trace.span(name, **attrs):
+        yield
+
+def incr(counter: str, amount: float = 1):
+    """Bumps a counter on the current trace, if any."""
+    trace = current_trace()
+    if trace is not None:
+        trace.incr(counter, amount)
+
+def to_chrome_trace(trace: Dict[str, Any]) -> Dict[str, Any]:
+    """Converts a stored trace to the Chrome Trace Event format (chrome://tracing, Perfetto)."""
+    thread_ids: Dict[str, int] = {}
+    events = []
+    for record in trace.get("spans", []):
+        tid = thread_ids.setdefault(record["thread"], len(thread_ids) + 1)
+        events.append({
+            "name": record["name"],
+            "ph": "X",
+            "ts": round(record["start"] * 1e6),
+            "dur": round(record["duration"] * 1e6),
+            "pid": 1,
+            "tid": tid,
+            "args": record.get("args", {}),
+        })
+    for thread, tid in thread_ids.items():
+        events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": thread}})
+    events.append({"name": "counters", "ph": "C", "ts": round(trace.get("total_seconds", 0) * 1e6),
+                   "pid": 1, "args": trace.get("counters", {})})
+    return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"name": trace.get("name")}}
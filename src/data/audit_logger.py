@@ -1,20 +1,99 @@
 import json
 import os
-from datetime import datetime
-from typing import Any, Dict
-from src.config import LOG_FILE
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, Union
+from src.config import AUDIT_DB, LOG_FILE
 
 class AuditLogger:
-    """Logs contract analysis activities for audit trails."""
+    """Logs contract analysis activities for audit trails.
+
+    Entries live in an append-only SQLite table (WAL mode, so concurrent sessions can
+    write safely) indexed by timestamp, contract type and risk score.
+    """
+    
+    COLUMNS = ["timestamp", "filename", "contract_type", "risk_score", "high_risk_clauses", "total_clauses"]
     
-    def __init__(self):
-        self.log_file = LOG_FILE
-        if not os.path.exists(os.path.dirname(self.log_file)):
-            os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
-            
-        if not os.path.exists(self.log_file):
-            with open(self.log_file, 'w') as f:
-                json.dump([], f)
+    def __init__(self, db_path: str = AUDIT_DB, legacy_file: str = LOG_FILE):
+        self.db_path = db_path
+        self.legacy_file = legacy_file
+        if not os.path.exists(os.path.dirname(self.db_path)):
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS audit_log ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, filename TEXT, "
+                "contract_type TEXT, risk_score REAL, high_risk_clauses INTEGER, total_clauses INTEGER)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_log(timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_type ON audit_log(contract_type, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_audit_risk ON audit_log(risk_score)")
+        conn.close()
+        self._migrate_legacy()
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per operation keeps the logger safe to share across threads
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _migrate_legacy(self):
+        """One-time import of the old JSON-array audit file, renamed afterwards.
+
+        A truncated or corrupt file is imported as far as its records parse and renamed
+        to *.corrupt, so it is neither retried on every start nor lost.
+        """
+        if not os.path.exists(self.legacy_file):
+            return
+        conn = self._connect()
+        try:
+            conn.execute("CREATE TABLE IF NOT EXISTS migrations (source TEXT PRIMARY KEY, migrated_at TEXT)")
+            conn.commit()
+            # Serialize with other writers so two sessions can't both import the file
+            conn.execute("BEGIN IMMEDIATE")
+            source = os.path.abspath(self.legacy_file)
+            if not os.path.exists(self.legacy_file):
+                conn.rollback()
+                return
+            corrupt = False
+            if conn.execute("SELECT 1 FROM migrations WHERE source = ?", (source,)).fetchone() is None:
+                with open(self.legacy_file, 'r', encoding='utf-8', errors='replace') as f:
+                    text = f.read()
+                try:
+                    logs = json.loads(text)
+                except ValueError:
+                    logs, corrupt = self._salvage(text), True
+                    print(f"Audit log {self.legacy_file} is corrupt; recovered {len(logs)} record(s)")
+                conn.executemany(
+                    f"INSERT INTO audit_log ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    [tuple(entry.get(col) for col in self.COLUMNS) for entry in logs if isinstance(entry, dict)]
+                )
+                # Recorded in the same transaction, so a crash before the rename can't import twice
+                conn.execute("INSERT INTO migrations (source, migrated_at) VALUES (?, ?)",
+                             (source, datetime.now().isoformat()))
+            conn.commit()
+            os.replace(self.legacy_file, self.legacy_file + (".corrupt" if corrupt else ".migrated"))
+        except Exception as e:
+            conn.rollback()
+            print(f"Audit log migration error: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _salvage(text: str) -> List[Dict[str, Any]]:
+        """Decodes every complete JSON object in a damaged array."""
+        decoder = json.JSONDecoder()
+        records, position = [], text.find("{")
+        while position != -1:
+            try:
+                entry, end = decoder.raw_decode(text, position)
+            except ValueError:
+                position = text.find("{", position + 1)
+                continue
+            if isinstance(entry, dict):
+                records.append(entry)
+            position = text.find("{", end)
+        return records
 
     def log_analysis(self, filename: str, contract_type: str, risk_score: float, details: Dict[str, Any]):
         """Logs a single analysis event."""
@@ -28,18 +107,98 @@ class AuditLogger:
         }
         
         try:
-            with open(self.log_file, 'r+') as f:
-                logs = json.load(f)
-                logs.append(log_entry)
-                f.seek(0)
-                json.dump(logs, f, indent=4)
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    f"INSERT INTO audit_log ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                    tuple(log_entry[col] for col in self.COLUMNS)
+                )
+            conn.close()
         except Exception as e:
             print(f"Audit logging error: {e}")
 
-    def get_logs(self):
-        """Retrieves all logs."""
+    def get_logs(self) -> List[Dict[str, Any]]:
+        """Retrieves all logs, oldest first."""
         try:
-            with open(self.log_file, 'r') as f:
-                return json.load(f)
-        except:
+            conn = self._connect()
+            rows = conn.execute(f"SELECT {', '.join(self.COLUMNS)} FROM audit_log ORDER BY id").fetchall()
+            conn.close()
+            return [dict(zip(self.COLUMNS, row)) for row in rows]
+        except Exception:
             return []
+
+    @staticmethod
+    def _where(since: Optional[Union[str, date]] = None, until: Optional[Union[str, date]] = None,
+               contract_type: Optional[str] = None, min_risk: Optional[float] = None) -> Tuple[str, list]:
+        """Builds an indexed WHERE clause; `until` is exclusive."""
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since.isoformat() if isinstance(since, date) else since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until.isoformat() if isinstance(until, date) else until)
+        if contract_type:
+            clauses.append("contract_type = ?")
+            params.append(contract_type)
+        if min_risk is not None:
+            clauses.append("risk_score >= ?")
+            params.append(min_risk)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def _fetch(self, sql: str, params: list) -> List[tuple]:
+        try:
+            conn = self._connect()
+            rows = conn.execute(sql, params).fetchall()
+            conn.close()
+            return rows
+        except Exception as e:
+            print(f"Audit query error: {e}")
+            return []
+
+    def query(self, since: Optional[Union[str, date]] = None, until: Optional[Union[str, date]] = None,
+              contract_type: Optional[str] = None, min_risk: Optional[float] = None,
+              limit: int = 50, offset: int = 0) -> List[Dict[str, Any]]:
+        """Returns one page of matching logs, newest first."""
+        where, params = self._where(since, until, contract_type, min_risk)
+        rows = self._fetch(
+            f"SELECT {', '.join(self.COLUMNS)} FROM audit_log{where} "
+            f"ORDER BY timestamp DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset]
+        )
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def count(self, since: Optional[Union[str, date]] = None, until: Optional[Union[str, date]] = None,
+              contract_type: Optional[str] = None, min_risk: Optional[float] = None) -> int:
+        """Counts matching logs."""
+        where, params = self._where(since, until, contract_type, min_risk)
+        rows = self._fetch(f"SELECT COUNT(*) FROM audit_log{where}", params)
+        return rows[0][0] if rows else 0
+
+    def summarize_by_type(self, since: Optional[Union[str, date]] = None, until: Optional[Union[str, date]] = None,
+                          contract_type: Optional[str] = None, min_risk: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Returns analysis counts and average risk per contract type."""
+        where, params = self._where(since, until, contract_type, min_risk)
+        rows = self._fetch(
+            f"SELECT contract_type, COUNT(*), ROUND(AVG(risk_score), 2) FROM audit_log{where} "
+            f"GROUP BY contract_type ORDER BY COUNT(*) DESC",
+            params
+        )
+        return [{"contract_type": t, "count": n, "avg_risk": avg} for t, n, avg in rows]
+
+    def summarize_by_day(self, since: Optional[Union[str, date]] = None, until: Optional[Union[str, date]] = None,
+                         contract_type: Optional[str] = None, min_risk: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Returns analysis counts and average risk per calendar day."""
+        where, params = self._where(since, until, contract_type, min_risk)
+        rows = self._fetch(
+            f"SELECT substr(timestamp, 1, 10) AS day, COUNT(*), ROUND(AVG(risk_score), 2) FROM audit_log{where} "
+            f"GROUP BY day ORDER BY day",
+            params
+        )
+        return [{"day": day, "count": n, "avg_risk": avg} for day, n, avg in rows]
+
+    def contract_types(self) -> List[str]:
+        """Returns the distinct contract types that have been logged."""
+        return [row[0] for row in self._fetch(
+            "SELECT DISTINCT contract_type FROM audit_log WHERE contract_type IS NOT NULL ORDER BY contract_type", []
+        )]
@@ -0,0 +1,602 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import numpy as np
+from src.config import (
+    CLAUSE_INDEX_DB, CLAUSE_INDEX_SNAPSHOT, CLAUSE_INDEX_TRAIN_SIZE,
+    CLAUSE_INDEX_NPROBE, CLAUSE_INDEX_EXACT_LIMIT
+)
+
+class ClauseIndex:
+    """Searchable store of every analysed clause: SQLite metadata plus a NumPy vector index.
+
+    SQLite is the source of truth for metadata and float32 embeddings, and several
+    processes can write to it safely. Writing never touches the in-memory index: a
+    process loads the vectors and the filterable metadata on its first search and then
+    picks up new and replaced rows incrementally. A store holds vectors from a single
+    embedder; see reembed() for switching models. Up to
+    train_size clauses are searched exactly. Beyond that an IVF index (spherical k-means
+    lists, n_probe lists scanned per query) keeps top-k queries far below 100 ms at a
+    million clauses. Training runs in a background thread, so queries never wait for it.
+    A snapshot file saves re-reading every embedding from SQLite on startup.
+    """
+
+    COLUMNS = ["id", "analyzed_at", "filename", "contract_type", "header", "content",
+               "category", "risk_label", "risk_score", "risks"]
+    FILTER_COLUMNS = ("category", "contract_type", "risk_label")
+    # Per-row arrays kept alongside the vectors; metadata is stored as vocabulary codes
+    ROW_ARRAYS = {"ids": np.int64, "assign": np.int32, "alive": np.bool_, "times": np.float64,
+                  "category": np.int32, "contract_type": np.int32, "risk_label": np.int32}
+    # New rows kept outside the inverted lists before they are rebuilt
+    MAX_UNLISTED_FRACTION = 0.1
+    # The IVF lists are retrained once the index has grown this much since training
+    RETRAIN_GROWTH = 4
+    SNAPSHOT_EVERY = 5000
+    KMEANS_ITERATIONS = 10
+    # Searching processes idle this long stop holding back pruning of the removed table
+    READER_TTL = 24 * 3600
+
+    def __init__(self, db_path: str = CLAUSE_INDEX_DB, snapshot_path: Optional[str] = CLAUSE_INDEX_SNAPSHOT,
+                 embed: Optional[Callable[[List[str]], Any]] = None, train_size: int = CLAUSE_INDEX_TRAIN_SIZE,
+                 n_probe: int = CLAUSE_INDEX_NPROBE, exact_limit: int = CLAUSE_INDEX_EXACT_LIMIT,
+                 allow_embedder_change: bool = False):
+        if embed is None:
+            from src.nlp.embeddings import default_embedder
+            embed = default_embedder()
+        self.embed = embed
+        self.embedder_name = getattr(embed, "name", getattr(embed, "__name__", "custom"))
+        self.db_path = db_path
+        self.snapshot_path = snapshot_path
+        self.train_size = max(1, train_size)
+        self.n_probe = max(1, n_probe)
+        self.exact_limit = exact_limit
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._training: Optional[threading.Thread] = None
+        self._saving: Optional[threading.Thread] = None
+        self._loaded = False
+        self._reader = uuid.uuid4().hex
+        self._touched_at = 0.0
+        self._generation = 0
+        self._reset_state()
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS clauses ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, analyzed_at TEXT NOT NULL, filename TEXT, "
+                "contract_type TEXT, doc_key TEXT, header TEXT, content TEXT, category TEXT, "
+                "risk_label TEXT, risk_score REAL, risks TEXT, embedder TEXT, vector BLOB, fingerprint TEXT)"
+            )
+            if "fingerprint" not in {row[1] for row in conn.execute("PRAGMA table_info(clauses)")}:
+                conn.execute("ALTER TABLE clauses ADD COLUMN fingerprint TEXT")
+            # Ids of replaced clauses, so every process can drop them from its in-memory index
+            conn.execute("CREATE TABLE IF NOT EXISTS removed (seq INTEGER PRIMARY KEY AUTOINCREMENT, clause_id INTEGER NOT NULL)")
+            # How far each searching process has applied the removed table, so it can be pruned
+            conn.execute("CREATE TABLE IF NOT EXISTS readers (reader TEXT PRIMARY KEY, last_removed INTEGER NOT NULL, seen_at REAL NOT NULL)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_clauses_time ON clauses(analyzed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_clauses_category ON clauses(category, analyzed_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_clauses_type ON clauses(contract_type)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_clauses_doc ON clauses(doc_key)")
+            stored_embedder = self._store_embedder(conn)
+        conn.close()
+        # Vectors from different embedders aren't comparable, so a store is never shared between them
+        if stored_embedder != self.embedder_name and not allow_embedder_change:
+            raise ValueError(f"Clause index {self.db_path} holds {stored_embedder} vectors, not {self.embedder_name}; "
+                             f"run `python reindex_clauses.py` to re-embed it")
+
+    def _store_embedder(self, conn: sqlite3.Connection) -> str:
+        """The embedder the store belongs to; a new store is claimed by this one."""
+        row = conn.execute("SELECT value FROM meta WHERE key = 'embedder'").fetchone()
+        if row is None:
+            # Stores created before the meta table belong to the embedder of their newest clause
+            newest = conn.execute("SELECT embedder FROM clauses ORDER BY id DESC LIMIT 1").fetchone()
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('embedder', ?)",
+                         (newest[0] if newest and newest[0] else self.embedder_name,))
+            row = conn.execute("SELECT value FROM meta WHERE key = 'embedder'").fetchone()
+        return row[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        # A short-lived connection per operation keeps the index safe to share across threads
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embeds and L2-normalizes texts, so a dot product is the cosine similarity."""
+        vectors = np.asarray(self.embed(texts), dtype=np.float32).reshape(len(texts), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    # --- Writing -----------------------------------------------------------------
+
+    @staticmethod
+    def make_key(clean_text: str) -> str:
+        """Identifies a document by its text alone, so re-analysis under a new model or
+        pipeline version replaces its clauses instead of storing them twice."""
+        return hashlib.sha256(clean_text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def fingerprint(results: Dict[str, Any]) -> str:
+        """Hashes everything stored per clause, so an unchanged re-analysis is a no-op."""
+        fields = [results.get("contract_type")] + [
+            [c.get("header"), c["content"], c.get("category"), c.get("risk_label"), c.get("risk_score"),
+             c.get("detected_risks")] for c in results.get("clauses") or []
+        ]
+        return hashlib.sha256(json.dumps(fields, default=str).encode("utf-8")).hexdigest()
+
+    def add(self, results: Dict[str, Any], doc_key: Optional[str] = None) -> int:
+        """Stores every clause of an analysis, replacing an earlier analysis of the same doc_key.
+
+        Returns the number of clauses written; re-adding identical results writes nothing.
+        """
+        clauses = results.get("clauses") or []
+        if not clauses:
+            return 0
+        fingerprint = self.fingerprint(results)
+        try:
+            conn = self._connect()
+            try:
+                stored = {}
+                if doc_key:
+                    rows = conn.execute("SELECT fingerprint, content, vector, embedder FROM clauses WHERE doc_key = ?",
+                                        (doc_key,)).fetchall()
+                    if rows and rows[0][0] == fingerprint:
+                        return 0
+                    # A re-analysis usually keeps the clause text, so earlier embeddings are reused
+                    stored = {content: vector for _, content, vector, embedder in rows if embedder == self.embedder_name}
+                # Embedding happens outside the write lock; the fingerprint check is repeated inside it
+                missing = [c["content"] for c in clauses if c["content"] not in stored]
+                if missing:
+                    stored.update(zip(missing, (v.tobytes() for v in self._embed(missing))))
+                analyzed_at = datetime.now().isoformat()
+                rows = [(
+                    analyzed_at, results.get("filename"), results.get("contract_type"), doc_key,
+                    c.get("header"), c["content"], c.get("category"), c.get("risk_label"), c.get("risk_score"),
+                    json.dumps(c.get("detected_risks") or []), self.embedder_name, stored[c["content"]], fingerprint
+                ) for c in clauses]
+                conn.execute("BEGIN IMMEDIATE")
+                if doc_key:
+                    previous = conn.execute("SELECT id, fingerprint FROM clauses WHERE doc_key = ?", (doc_key,)).fetchall()
+                    if previous and previous[0][1] == fingerprint:
+                        conn.rollback()
+                        return 0
+                    conn.execute("DELETE FROM clauses WHERE doc_key = ?", (doc_key,))
+                    conn.executemany("INSERT INTO removed (clause_id) VALUES (?)", [(row[0],) for row in previous])
+                conn.executemany(
+                    "INSERT INTO clauses (analyzed_at, filename, contract_type, doc_key, header, content, category, "
+                    "risk_label, risk_score, risks, embedder, vector, fingerprint) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                conn.commit()
+            finally:
+                conn.close()
+            # Only searching processes load the new rows, so writers never hold the vectors in memory
+            return len(rows)
+        except Exception as e:
+            print(f"Clause index error: {e}")
+            return 0
+
+    def reembed(self, batch_size: int = 256) -> int:
+        """Re-embeds every clause stored with another embedder and hands the store to this one.
+
+        A maintenance pass (see reindex_clauses.py) for after switching spaCy models; stop
+        other processes using the index first. Returns the number of clauses re-embedded.
+        """
+        count = 0
+        conn = self._connect()
+        try:
+            while True:
+                rows = conn.execute("SELECT id, content FROM clauses WHERE embedder IS NOT ? LIMIT ?",
+                                    (self.embedder_name, batch_size)).fetchall()
+                if not rows:
+                    break
+                vectors = self._embed([content or "" for _, content in rows])
+                with conn:
+                    conn.executemany("UPDATE clauses SET embedder = ?, vector = ? WHERE id = ?",
+                                     [(self.embedder_name, v.tobytes(), clause_id) for (clause_id, _), v in zip(rows, vectors)])
+                count += len(rows)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('embedder', ?)", (self.embedder_name,))
+        finally:
+            conn.close()
+        with self._lock:
+            # Rows were rewritten in place, so anything already in memory is stale
+            self._reset_state()
+            self._loaded = False
+        return count
+
+    # --- In-memory index -----------------------------------------------------------
+
+    def _reset_state(self):
+        # Background training started before a reset must not write into the new state
+        self._generation += 1
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._rows = {name: np.zeros(0, dtype) for name, dtype in self.ROW_ARRAYS.items()}
+        self._vocab: Dict[str, Dict[str, int]] = {column: {} for column in self.FILTER_COLUMNS}
+        self._size = self._last_id = self._last_removed = 0
+        self._trained_size = self._saved_size = 0
+        self._centroids: Optional[np.ndarray] = None
+        # Row positions per centroid; rows from _listed onwards are not in the lists yet
+        self._lists: List[np.ndarray] = []
+        self._listed = 0
+
+    def _ensure_loaded(self):
+        """Loads the snapshot on the first search; called under the lock."""
+        if not self._loaded:
+            self._loaded = True
+            self._load_snapshot()
+
+    def _load_snapshot(self):
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with np.load(self.snapshot_path, allow_pickle=False) as data:
+                if str(data["embedder"]) != self.embedder_name:
+                    return
+                for column in self.FILTER_COLUMNS:
+                    self._vocab[column] = {value: code for code, value in enumerate(data[f"vocab_{column}"].tolist())}
+                rows = {name: data[name] for name in self.ROW_ARRAYS}
+                self._append(data["vectors"], rows, build=False)
+                self._last_removed = int(data["last_removed"])
+                if data["centroids"].size:
+                    self._centroids = data["centroids"]
+                    self._trained_size = int(data["trained_size"])
+                    self._build_lists()
+            self._saved_size = self._size
+            self._maybe_train()
+        except Exception as e:
+            print(f"Clause index snapshot error (rebuilding from the database): {e}")
+            self._reset_state()
+
+    def _capture(self) -> Dict[str, np.ndarray]:
+        """Snapshot arrays; called under the lock. Vector rows are never rewritten, so a view is enough."""
+        n = self._size
+        state = {name: values[:n].copy() for name, values in self._rows.items()}
+        state.update({f"vocab_{column}": np.array(list(vocab), dtype=str) for column, vocab in self._vocab.items()})
+        state.update(embedder=np.array(self.embedder_name), vectors=self._vectors[:n],
+                     centroids=self._centroids if self._centroids is not None else np.zeros((0, 0), np.float32),
+                     trained_size=np.array(self._trained_size), last_removed=np.array(self._last_removed))
+        return state
+
+    def _write_snapshot(self, state: Dict[str, np.ndarray]):
+        """Writes captured arrays to the snapshot file (one file, replaced atomically)."""
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        with self._save_lock:
+            tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp.npz"
+            try:
+                np.savez(tmp_path, **state)
+                os.replace(tmp_path, self.snapshot_path)
+            except Exception as e:
+                print(f"Clause index snapshot write error: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return
+        self._prune_removed(int(state["last_removed"]))
+
+    def _prune_removed(self, through: int):
+        """Deletes removal records that the snapshot and every active searching process have applied."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            # Readers idle past READER_TTL stop holding records back; they reload from scratch if they return
+            conn.execute("DELETE FROM readers WHERE seen_at < ?", (time.time() - self.READER_TTL,))
+            lowest = conn.execute("SELECT MIN(last_removed) FROM readers").fetchone()[0]
+            if lowest is not None:
+                through = min(through, lowest)
+            pruned = conn.execute("SELECT value FROM meta WHERE key = 'pruned_through'").fetchone()
+            if pruned is None or int(pruned[0]) < through:
+                conn.execute("DELETE FROM removed WHERE seq <= ?", (through,))
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('pruned_through', ?)", (str(through),))
+            conn.commit()
+        except Exception as e:
+            print(f"Clause index pruning error: {e}")
+        finally:
+            conn.close()
+
+    def save(self):
+        """Writes the in-memory index to the snapshot file."""
+        if not self.snapshot_path or not self._loaded:
+            return
+        with self._lock:
+            state = self._capture()
+            self._saved_size = self._size
+        self._write_snapshot(state)
+
+    def _save_in_background(self):
+        # Called under the lock; the write itself doesn't hold it
+        if not self.snapshot_path or (self._saving is not None and self._saving.is_alive()):
+            return
+        state = self._capture()
+        self._saved_size = self._size
+        self._saving = threading.Thread(target=self._write_snapshot, args=(state,), name="clause-index-save", daemon=True)
+        self._saving.start()
+
+    def join(self, timeout: Optional[float] = None):
+        """Waits for background training and snapshot writes to finish."""
+        for thread in (self._training, self._saving):
+            if thread is not None:
+                thread.join(timeout)
+
+    def _sync(self):
+        """Loads clauses added, and drops clauses replaced, since the last sync, by any process."""
+        conn = self._connect()
+        try:
+            # One read transaction, so pruning can't slip in between the reads
+            conn.execute("BEGIN")
+            pruned = conn.execute("SELECT value FROM meta WHERE key = 'pruned_through'").fetchone()
+            pruned = int(pruned[0]) if pruned else 0
+            if pruned > self._last_removed:
+                # Removals this process never applied were pruned (it sat idle past READER_TTL)
+                if self._size:
+                    print("Clause index missed pruned removals; reloading from the database")
+                    self._reset_state()
+                self._last_removed = pruned
+            rows = conn.execute(
+                "SELECT id, vector, analyzed_at, category, contract_type, risk_label FROM clauses "
+                "WHERE id > ? AND embedder = ? ORDER BY id", (self._last_id, self.embedder_name)
+            ).fetchall()
+            removed = conn.execute("SELECT seq, clause_id FROM removed WHERE seq > ? ORDER BY seq",
+                                   (self._last_removed,)).fetchall()
+            conn.commit()
+            now = time.time()
+            if removed or now - self._touched_at > self.READER_TTL / 4:
+                with conn:
+                    conn.execute("INSERT OR REPLACE INTO readers (reader, last_removed, seen_at) VALUES (?, ?, ?)",
+                                 (self._reader, removed[-1][0] if removed else self._last_removed, now))
+                self._touched_at = now
+        finally:
+            conn.close()
+        if rows:
+            count = len(rows)
+            vectors = np.frombuffer(b"".join(r[1] for r in rows), dtype=np.float32).reshape(count, -1)
+            values = {
+                "ids": np.fromiter((r[0] for r in rows), dtype=np.int64, count=count),
+                "alive": np.ones(count, dtype=np.bool_),
+                "times": np.fromiter((self._timestamp(r[2]) for r in rows), dtype=np.float64, count=count),
+            }
+            for offset, column in enumerate(self.FILTER_COLUMNS, start=3):
+                values[column] = np.fromiter((self._code(column, r[offset]) for r in rows), dtype=np.int32, count=count)
+            self._append(vectors, values)
+        if removed:
+            self._last_removed = removed[-1][0]
+            positions = self._positions(np.array([r[1] for r in removed], dtype=np.int64))
+            self._rows["alive"][positions] = False
+        if self._size - self._saved_size >= self.SNAPSHOT_EVERY:
+            self._save_in_background()
+
+    def _code(self, column: str, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        return self._vocab[column].setdefault(value, len(self._vocab[column]))
+
+    @staticmethod
+    def _timestamp(value: Union[str, date]) -> float:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if not isinstance(value, datetime):
+            value = datetime.combine(value, datetime.min.time())
+        return value.timestamp()
+
+    def _positions(self, ids: np.ndarray) -> np.ndarray:
+        """Row positions of the ids held in memory (ids are appended in increasing order)."""
+        held = self._rows["ids"][:self._size]
+        positions = np.searchsorted(held, ids)
+        positions = positions[positions < self._size]
+        return positions[np.isin(held[positions], ids)]
+
+    def _append(self, vectors: np.ndarray, values: Dict[str, np.ndarray], build: bool = True):
+        """Adds rows to the growable buffers and files them into the IVF lists."""
+        n, count = self._size, len(vectors)
+        if count == 0:
+            return
+        if self._vectors.shape[1] != vectors.shape[1]:
+            self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+        if n + count > len(self._vectors):
+            # Capacity doubles, so appends cost amortized O(1) per row. The old buffer stays
+            # valid for background training and snapshot writes still reading it.
+            capacity = max(1024, 2 * len(self._vectors), n + count)
+            vectors_buffer = np.zeros((capacity, vectors.shape[1]), np.float32)
+            vectors_buffer[:n] = self._vectors[:n]
+            self._vectors = vectors_buffer
+            for name, array in self._rows.items():
+                buffer = np.zeros(capacity, array.dtype)
+                buffer[:n] = array[:n]
+                self._rows[name] = buffer
+        self._vectors[n:n + count] = vectors
+        for name in self._rows:
+            if name in values:
+                self._rows[name][n:n + count] = values[name]
+        self._size = n + count
+        self._last_id = int(self._rows["ids"][self._size - 1])
+        if not build:
+            return
+
+        if self._centroids is not None:
+            self._rows["assign"][n:n + count] = self._nearest(vectors, self._centroids)
+            if self._size - self._listed > self.MAX_UNLISTED_FRACTION * self._size:
+                self._build_lists()
+        self._maybe_train()
+
+    def _maybe_train(self):
+        """Starts background (re)training once the index has outgrown its lists; called under the lock."""
+        due = self.train_size if self._centroids is None else self.RETRAIN_GROWTH * self._trained_size
+        if self._size >= due and (self._training is None or not self._training.is_alive()):
+            self._training = threading.Thread(target=self._train, args=(self._vectors[:self._size], self._generation),
+                                              name="clause-index-train", daemon=True)
+            self._training.start()
+
+    @staticmethod
+    def _nearest(vectors: np.ndarray, centroids: np.ndarray, chunk: int = 16384) -> np.ndarray:
+        return np.concatenate([
+            np.argmax(vectors[i:i + chunk] @ centroids.T, axis=1).astype(np.int32)
+            for i in range(0, len(vectors), chunk)
+        ]) if len(vectors) else np.zeros(0, np.int32)
+
+    def _train(self, vectors: np.ndarray, generation: int):
+        """Spherical k-means on a sample, run in a background thread; queries keep using
+        the previous lists (or an exact scan) until the new ones are swapped in."""
+        try:
+            n = len(vectors)
+            n_lists = int(min(4096, max(16, np.sqrt(n))))
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(n, size=min(n, n_lists * 32), replace=False)]
+            centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+            for _ in range(self.KMEANS_ITERATIONS):
+                assign = self._nearest(sample, centroids)
+                counts = np.bincount(assign, minlength=n_lists)
+                order = np.argsort(assign, kind="stable")
+                nonempty = counts > 0
+                starts = np.concatenate(([0], np.cumsum(counts)[:-1]))[nonempty]
+                centroids[nonempty] = np.add.reduceat(sample[order], starts, axis=0)
+                # Empty lists are re-seeded with random sample points
+                centroids[~nonempty] = sample[rng.choice(len(sample), size=int((~nonempty).sum()))]
+                centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+            assign = self._nearest(vectors, centroids)
+            with self._lock:
+                if generation != self._generation:
+                    # The index was reloaded while training; a later sync retrains it
+                    return
+                # Rows added while training get filed under the new centroids too
+                self._rows["assign"][:n] = assign
+                self._rows["assign"][n:self._size] = self._nearest(self._vectors[n:self._size], centroids)
+                self._centroids = centroids
+                self._trained_size = n
+                self._build_lists()
+                state = self._capture() if self.snapshot_path else None
+                self._saved_size = self._size
+            if state is not None:
+                self._write_snapshot(state)
+        except Exception as e:
+            print(f"Clause index training error: {e}")
+
+    def _build_lists(self):
+        """Rebuilds the inverted lists (row positions per centroid) from the assignments."""
+        n = self._size
+        order = np.argsort(self._rows["assign"][:n], kind="stable")
+        bounds = np.searchsorted(self._rows["assign"][:n][order], np.arange(len(self._centroids) + 1))
+        self._lists = [order[bounds[i]:bounds[i + 1]] for i in range(len(self._centroids))]
+        self._listed = n
+
+    # --- Searching ---------------------------------------------------------------
+
+    def _candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        """Row positions in the n_probe lists nearest the query."""
+        probe = min(n_probe, len(self._centroids))
+        nearest = np.argpartition(-(self._centroids @ query), probe - 1)[:probe]
+        rows = [self._lists[i] for i in nearest]
+        unlisted = self._rows["assign"][self._listed:self._size]
+        rows.append(self._listed + np.flatnonzero(np.isin(unlisted, nearest)))
+        return np.concatenate(rows)
+
+    def _top(self, query: np.ndarray, rows: Optional[np.ndarray], k: int) -> List[Tuple[int, float]]:
+        """(clause id, score) of the k best rows, best first."""
+        vectors = self._vectors[:self._size] if rows is None else self._vectors[rows]
+        if len(vectors) == 0:
+            return []
+        scores = vectors @ query
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        positions = best if rows is None else rows[best]
+        return [(int(self._rows["ids"][p]), float(scores[b])) for p, b in zip(positions, best)]
+
+    def _mask(self, since: Optional[Union[str, date]], until: Optional[Union[str, date]],
+              filters: Dict[str, Optional[str]]) -> np.ndarray:
+        """Rows that are live and pass every filter; `until` is exclusive."""
+        n = self._size
+        mask = self._rows["alive"][:n].copy()
+        if since is not None:
+            mask &= self._rows["times"][:n] >= self._timestamp(since)
+        if until is not None:
+            mask &= self._rows["times"][:n] < self._timestamp(until)
+        for column, value in filters.items():
+            if value:
+                # A value never stored has no code and matches nothing
+                mask &= self._rows[column][:n] == self._vocab[column].get(value, -2)
+        return mask
+
+    def search(self, query: str, k: int = 10, since: Optional[Union[str, date]] = None,
+               until: Optional[Union[str, date]] = None, category: Optional[str] = None,
+               contract_type: Optional[str] = None, risk_label: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns the k clauses most similar to the query, best first, with their metadata and score.
+
+        Filters are evaluated on in-memory NumPy arrays. Filters matching at most
+        exact_limit clauses are searched exactly; broader ones filter the IVF candidates,
+        probing more lists until k clauses pass.
+        """
+        query_vector = self._embed([query])[0]
+        if not query_vector.any():
+            return []
+        filters = {"category": category, "contract_type": contract_type, "risk_label": risk_label}
+        try:
+            with self._lock:
+                self._ensure_loaded()
+                self._sync()
+                mask = self._mask(since, until, filters)
+                matching = int(mask.sum())
+                if matching == 0:
+                    return []
+                if self._centroids is None or matching <= self.exact_limit:
+                    rows = None if matching == self._size else np.flatnonzero(mask)
+                    hits = self._top(query_vector, rows, k)
+                else:
+                    n_probe = self.n_probe
+                    while True:
+                        candidates = self._candidates(query_vector, n_probe)
+                        candidates = candidates[mask[candidates]]
+                        if len(candidates) >= k or n_probe >= len(self._centroids):
+                            break
+                        n_probe *= 4
+                    hits = self._top(query_vector, candidates, k)
+            return self._fetch(hits)
+        except Exception as e:
+            print(f"Clause search error: {e}")
+            return []
+
+    def _fetch(self, hits: List[Tuple[int, float]]) -> List[Dict[str, Any]]:
+        """Loads metadata for scored ids in score order, dropping any replaced since the search."""
+        if not hits:
+            return []
+        scores = dict(hits)
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM clauses WHERE id IN ({', '.join('?' * len(hits))})", list(scores)
+            ).fetchall()
+        finally:
+            conn.close()
+        results = []
+        for row in rows:
+            entry = dict(zip(self.COLUMNS, row))
+            entry["risks"] = json.loads(entry["risks"] or "[]")
+            entry["score"] = round(scores[entry["id"]], 4)
+            results.append(entry)
+        return sorted(results, key=lambda entry: -entry["score"])
+
+    def count(self) -> int:
+        conn = self._connect()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM clauses").fetchone()[0]
+        finally:
+            conn.close()
+
+    def distinct(self, column: str) -> List[str]:
+        """Distinct values of category, contract_type or risk_label, for filter menus."""
+        if column not in self.FILTER_COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        conn = self._connect()
+        try:
+            return [row[0] for row in conn.execute(
+                f"SELECT DISTINCT {column} FROM clauses WHERE {column} IS NOT NULL ORDER BY {column}"
+            ).fetchall()]
+        finally:
+            conn.close()
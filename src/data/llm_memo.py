@@ -0,0 +1,94 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+from src.core.tracing import incr
+from src.config import LLM_MODEL, LLM_MEMO_DB, LLM_MEMO_MAX_ENTRIES, LLM_MEMO_ENABLED
+
+class LLMMemo:
+    """On-disk LRU memo of LLM responses keyed by normalized clause text, prompt and model."""
+
+    def __init__(self, db_path: str = LLM_MEMO_DB, max_entries: int = LLM_MEMO_MAX_ENTRIES,
+                 enabled: bool = LLM_MEMO_ENABLED):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS memo ("
+            "key TEXT PRIMARY KEY, name TEXT, response TEXT, last_access REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_memo_access ON memo(last_access)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS stats ("
+            "name TEXT PRIMARY KEY, hits INTEGER DEFAULT 0, misses INTEGER DEFAULT 0)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Normalizes clause text so layout-only differences share a key."""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    def make_key(self, template: str, text: str, extra: str = "", model: str = LLM_MODEL) -> str:
+        """Hashes the prompt template, model, normalized text and any extra prompt inputs."""
+        digest = hashlib.sha256()
+        for part in (template, model, self.normalize(text), extra):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, name: str, template: str, text: str, extra: str = "") -> Optional[Any]:
+        """Returns the memoized response, recording a hit or miss under the stage name."""
+        if not self.enabled:
+            return None
+        key = self.make_key(template, text, extra)
+        try:
+            with self._lock:
+                row = self._conn.execute("SELECT response FROM memo WHERE key = ?", (key,)).fetchone()
+                column = "hits" if row else "misses"
+                self._conn.execute("INSERT OR IGNORE INTO stats (name) VALUES (?)", (name,))
+                self._conn.execute(f"UPDATE stats SET {column} = {column} + 1 WHERE name = ?", (name,))
+                if row:
+                    self._conn.execute("UPDATE memo SET last_access = ? WHERE key = ?", (time.time(), key))
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"LLM memo read error: {e}")
+            return None
+        incr(f"llm_memo.{name}.{column}")
+        return json.loads(row[0]) if row else None
+
+    def put(self, name: str, template: str, text: str, response: Any, extra: str = ""):
+        """Stores a response and evicts the least recently used entries beyond the limit."""
+        if not self.enabled:
+            return
+        key = self.make_key(template, text, extra)
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO memo (key, name, response, last_access) VALUES (?, ?, ?, ?)",
+                    (key, name, json.dumps(response, ensure_ascii=False), time.time())
+                )
+                count = self._conn.execute("SELECT COUNT(*) FROM memo").fetchone()[0]
+                if count > self.max_entries:
+                    self._conn.execute(
+                        "DELETE FROM memo WHERE key IN ("
+                        "SELECT key FROM memo ORDER BY last_access ASC LIMIT ?)",
+                        (count - self.max_entries,)
+                    )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"LLM memo write error: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns hit and miss counters per stage name."""
+        with self._lock:
+            rows = self._conn.execute("SELECT name, hits, misses FROM stats ORDER BY name").fetchall()
+        return {name: {"hits": hits, "misses": misses} for name, hits, misses in rows}
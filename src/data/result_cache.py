@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+from src.config import (
+    LLM_MODEL, PIPELINE_VERSION, RESULT_CACHE_DIR,
+    RESULT_CACHE_MAX_MB, RESULT_CACHE_MAX_AGE_DAYS
+)
+
+class ResultCache:
+    """Content-addressed on-disk cache of full contract analysis results."""
+
+    def __init__(self, cache_dir: str = RESULT_CACHE_DIR, max_mb: float = RESULT_CACHE_MAX_MB,
+                 max_age_days: float = RESULT_CACHE_MAX_AGE_DAYS):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(clean_text: str, model: str = LLM_MODEL, version: str = PIPELINE_VERSION) -> str:
+        """Hashes the cleaned document text together with the model and pipeline version."""
+        digest = hashlib.sha256()
+        for part in (version, model, clean_text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached results for a key, or None on a miss or expired entry."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Result cache read error: {e}")
+            self._remove(path)
+            return None
+
+        if time.time() - entry.get("cached_at", 0) > self.max_age:
+            self._remove(path)
+            return None
+
+        # Bump mtime so size-based eviction drops least recently used entries first
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return entry.get("results")
+
+    def put(self, key: str, results: Dict[str, Any]):
+        """Stores results atomically and enforces the size and age limits."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"cached_at": time.time(), "results": results}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Result cache write error: {e}")
+            self._remove(tmp_path)
+            return
+        self.evict()
+
+    def evict(self):
+        """Removes expired entries, then the least recently used ones until under the size limit."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            # Entries untouched for longer than max age can't still be fresh
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """Deletes every cached result."""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".json"):
+                self._remove(os.path.join(self.cache_dir, name))
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -1,34 +1,44 @@
-import openai
 from typing import List, Dict, Any
-from src.config import OPENAI_API_KEY, LLM_MODEL
+from src.core.registry import get_llm_gateway, get_llm_memo
+from src.core.prompt_builder import PromptBuilder
 
 class AlternativeSuggester:
     """Suggests alternative, more favorable wordings for high-risk clauses."""
     
+    PROMPT_TEMPLATE = """
+        Original Clause (Risk identified: {risks}):
+        {original_clause}
+        
+        Task: Provide a more SME-friendly, balanced alternative to this clause that reduces the identified risks while maintaining the core business purpose.
+        
+        Provide result in JSON format with 'alternative' and 'explanation'.
+        """
+
     def __init__(self):
-        pass
+        self.prompt_builder = PromptBuilder()
 
     def suggest_alternative(self, original_clause: str, risks: List[str]) -> Dict[str, Any]:
         """Generates a more SME-friendly alternative using LLM."""
-        if not OPENAI_API_KEY:
+        if not get_llm_gateway().is_available():
             return {
                 "alternative": "Suggestion requires LLM access.",
                 "explanation": "Consult a legal professional for alternative wording."
             }
 
-        prompt = f"""
-        Original Clause (Risk identified: {', '.join(risks)}):
-        {original_clause}
-        
-        Task: Provide a more SME-friendly, balanced alternative to this clause that reduces the identified risks while maintaining the core business purpose.
-        
-        Provide result in JSON format with 'alternative' and 'explanation'.
-        """
+        risk_list = ', '.join(risks)
+        memo = get_llm_memo()
+        cached = memo.get("alternative_suggestion", self.PROMPT_TEMPLATE, original_clause, extra=risk_list)
+        if cached is not None:
+            return cached
+
+        budget = self.prompt_builder.budget("clause", self.PROMPT_TEMPLATE + risk_list)
+        # The memo stays keyed on the full clause, so long clauses still hit it
+        prompt_text = self.prompt_builder.truncate(original_clause, budget)
+        prompt = self.PROMPT_TEMPLATE.format(risks=risk_list, original_clause=prompt_text)
 
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=LLM_MODEL,
+            response = get_llm_gateway().chat(
+                "alternative_suggestion",
                 messages=[
                     {"role": "system", "content": "You are a legal negotiator for SMEs. Output ONLY valid JSON."},
                     {"role": "user", "content": prompt}
@@ -36,7 +46,9 @@ class AlternativeSuggester:
                 response_format={"type": "json_object"}
             )
             import json
-            return json.loads(response.choices[0].message.content)
+            result = json.loads(response.choices[0].message.content)
+            memo.put("alternative_suggestion", self.PROMPT_TEMPLATE, original_clause, result, extra=risk_list)
+            return result
         except Exception as e:
             print(f"Alternative Suggestion error: {e}")
             return {
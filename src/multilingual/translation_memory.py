@@ -0,0 +1,69 @@
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Dict, Iterable, Tuple
+from src.config import TRANSLATION_MEMORY_DB, TRANSLATION_MEMORY_ENABLED
+
+class TranslationMemory:
+    """Segment-level translation memory persisted in a local SQLite store."""
+
+    def __init__(self, db_path: str = TRANSLATION_MEMORY_DB, enabled: bool = TRANSLATION_MEMORY_ENABLED):
+        self.db_path = db_path
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS segments ("
+            "source TEXT, target TEXT, segment TEXT, translation TEXT, created_at REAL, "
+            "PRIMARY KEY (source, target, segment))"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(segment: str) -> str:
+        """Normalizes a segment (Unicode form and whitespace) before lookup."""
+        return " ".join(unicodedata.normalize("NFC", segment).split())
+
+    def get_many(self, segments: Iterable[str], source: str, target: str) -> Dict[str, str]:
+        """Returns {normalized segment: translation} for every segment already in memory."""
+        if not self.enabled:
+            return {}
+        keys = list({self.normalize(s) for s in segments})
+        found = {}
+        try:
+            with self._lock:
+                # Stay under SQLite's bound-parameter limit
+                for i in range(0, len(keys), 500):
+                    batch = keys[i:i + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT segment, translation FROM segments "
+                        f"WHERE source = ? AND target = ? AND segment IN ({placeholders})",
+                        [source, target] + batch
+                    ).fetchall()
+                    found.update(rows)
+        except sqlite3.Error as e:
+            print(f"Translation memory read error: {e}")
+        return found
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]], source: str, target: str):
+        """Stores (segment, translation) pairs."""
+        if not self.enabled:
+            return
+        now = time.time()
+        rows = [(source, target, self.normalize(segment), translation, now) for segment, translation in pairs]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO segments (source, target, segment, translation, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Translation memory write error: {e}")
@@ -1,41 +1,181 @@
-from deep_translator import GoogleTranslator
-from typing import List, Union
+import re
+import time
+from typing import List, Optional, Tuple
+from src.config import TRANSLATION_CHUNK_CHARS, TRANSLATION_WORKERS, TRANSLATION_RETRIES
+from src.core.registry import get_translator, get_translation_memory
+from src.pipeline.executor import ClauseExecutor
+from src.core.tracing import incr, span
+
+# Abbreviations whose full stop never ends a sentence ("Rs. 5,000", "श्री. राम", "No. 12")
+ABBREVIATIONS = [
+    "Rs", "No", "Nos", "Sh", "Shri", "Sri", "Smt", "Mr", "Mrs", "Ms", "Dr", "Ltd", "Pvt", "Co",
+    "Sec", "Art", "Cl", "vs", "viz", "e.g", "i.e",
+    "श्री", "श्रीमती", "सुश्री", "डॉ", "रु", "सं", "क्र",
+]
+# Python lookbehinds are fixed-width, so each abbreviation gets its own
+_NOT_ABBREVIATION = "".join(rf"(?<!\b{re.escape(abbr)}\.)" for abbr in ABBREVIATIONS)
 
 class ContractTranslator:
     """Translates Hindi contracts to English for easier NLP processing."""
+
+    # Sentence ends (danda, double danda, Latin punctuation) or line breaks; the separator is kept.
+    # A full stop after a digit is a clause number ("1.", "१."), not a sentence end, and neither
+    # is one after an abbreviation.
+    SENTENCE_SPLIT = re.compile(rf'((?:(?<=[।॥!?])|(?<=[^\d०-९]\.){_NOT_ABBREVIATION})[ \t]+|\s*\n\s*)')
+    # Misaligned chunks are halved until this small, then sent one segment per request
+    SEGMENT_FALLBACK_MAX = 4
     
-    def __init__(self):
-        # We initialize the translator with source 'hi' and target 'en'
-        # deep-translator instances are specific to source-target pairs usually, 
-        # or we can pass it in translate() but defining it here is cleaner if fixed.
-        # However, to match previous flexibility, we can just instantiate it.
-        # deep_translator's GoogleTranslator takes source and target in constructor.
-        self.translator = GoogleTranslator(source='hi', target='en')
+    def __init__(self, source: str = 'hi', target: str = 'en'):
+        self.source = source
+        self.target = target
 
-    def translate_to_english(self, text: str) -> str:
-        """Translates Hindi text to English."""
-        try:
-            # deep-translator handles limits better, but explicit chunking is still safe for massive texts.
-            # 5000 chars is Google's limit usually.
-            if len(text) > 4500:
-                chunks = [text[i:i+4500] for i in range(0, len(text), 4500)]
-                translated_chunks = []
-                for chunk in chunks:
-                    # translate method returns a string directly
-                    result = self.translator.translate(chunk)
-                    translated_chunks.append(result)
-                return " ".join(translated_chunks)
+    @property
+    def translator(self):
+        """Shared GoogleTranslator for the calling thread, provided by the registry."""
+        return get_translator(self.source, self.target)
+
+    def split_segments(self, text: str, limit: int = TRANSLATION_CHUNK_CHARS) -> List[Tuple[str, str]]:
+        """Splits text into sentences of at most `limit` characters.
+
+        Returns (segment, separator) pairs; the separator ('\n' or ' ') rejoins the translations.
+        """
+        parts = self.SENTENCE_SPLIT.split(text)
+        # re.split with a capture group alternates segment, separator, segment, ...
+        segments = []
+        for i in range(0, len(parts), 2):
+            segment = parts[i].strip()
+            if not segment:
+                continue
+            separator = parts[i + 1] if i + 1 < len(parts) else ""
+            pieces = self._split_oversized(segment, limit)
+            # Pieces of one long sentence rejoin with spaces; the sentence's own separator follows the last piece
+            segments.extend((piece, " ") for piece in pieces[:-1])
+            segments.append((pieces[-1], "\n" if "\n" in separator else " "))
+        if segments:
+            segments[-1] = (segments[-1][0], "")
+        return segments
+
+    @staticmethod
+    def pack_chunks(segments: List[str], limit: int = TRANSLATION_CHUNK_CHARS) -> List[List[str]]:
+        """Groups segments into newline-joined chunks of at most `limit` characters."""
+        chunks, current, size = [], [], 0
+        for segment in segments:
+            if current and size + 1 + len(segment) > limit:
+                chunks.append(current)
+                current, size = [], 0
+            size += len(segment) + (1 if current else 0)
+            current.append(segment)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    @staticmethod
+    def _split_oversized(segment: str, limit: int) -> List[str]:
+        """Splits a sentence longer than the limit on whitespace, hard-cutting only unbroken runs."""
+        if len(segment) <= limit:
+            return [segment]
+        pieces, current = [], ""
+        for word in segment.split():
+            while len(word) > limit:
+                if current:
+                    pieces.append(current)
+                    current = ""
+                pieces.append(word[:limit])
+                word = word[limit:]
+            if current and len(current) + 1 + len(word) > limit:
+                pieces.append(current)
+                current = word
             else:
+                current = f"{current} {word}" if current else word
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _translate_with_retry(self, text: str) -> Optional[str]:
+        """Translates one request, retrying with backoff; returns None if every attempt fails."""
+        for attempt in range(TRANSLATION_RETRIES + 1):
+            try:
                 return self.translator.translate(text)
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return text # Fallback to original text
+            except Exception as e:
+                if attempt == TRANSLATION_RETRIES:
+                    print(f"Translation error (kept untranslated): {e}")
+                    return None
+                time.sleep(0.5 * (2 ** attempt))
+        return None
+
+    def _translate_chunk(self, segments: List[str]) -> List[Optional[str]]:
+        """Translates a chunk of segments in one request, one line per segment.
+
+        If the translation doesn't come back with one line per segment, the two halves
+        are retried separately, narrowing in on the merged or split line; only chunks of
+        at most SEGMENT_FALLBACK_MAX segments are retried one segment at a time.
+        """
+        if len(segments) > 1:
+            result = self._translate_with_retry("\n".join(segments))
+            if result is None:
+                # Every attempt failed; more requests won't do better
+                return [None] * len(segments)
+            lines = [line.strip() for line in result.split("\n") if line.strip()]
+            if len(lines) == len(segments):
+                return lines
+            if len(segments) > self.SEGMENT_FALLBACK_MAX:
+                middle = len(segments) // 2
+                return self._translate_chunk(segments[:middle]) + self._translate_chunk(segments[middle:])
+        return [self._translate_with_retry(segment) for segment in segments]
+
+    def _translate_chunk_traced(self, segments: List[str]) -> List[Optional[str]]:
+        with span("translate_chunk", segments=len(segments)):
+            return self._translate_chunk(segments)
+
+    def _translate_segments(self, segments: List[str]) -> List[str]:
+        """Translates segments via the translation memory, sending only the misses remotely."""
+        memory = get_translation_memory()
+        keys = [memory.normalize(segment) for segment in segments]
+        known = memory.get_many(keys, self.source, self.target)
+        
+        # Each distinct missing segment is translated once, chunked under Google's size limit
+        missing = list(dict.fromkeys(key for key in keys if key and key not in known))
+        incr("translation_memory.hits", len({key for key in keys if key}) - len(missing))
+        incr("translation_memory.misses", len(missing))
+        if missing:
+            chunks = self.pack_chunks(missing)
+            executor = ClauseExecutor(max_workers=TRANSLATION_WORKERS)
+            results = executor.map(self._translate_chunk_traced, chunks)
+            fresh = [
+                (segment, translation)
+                for chunk, translations in zip(chunks, results)
+                for segment, translation in zip(chunk, translations)
+                if translation is not None
+            ]
+            memory.put_many(fresh, self.source, self.target)
+            known.update(fresh)
+        
+        # Failed segments fall back to their original text
+        return [known.get(key, segment) for key, segment in zip(keys, segments)]
+
+    def translate_to_english(self, text: str) -> str:
+        """Translates Hindi text to English."""
+        if not text or not text.strip():
+            return text
+        
+        segments = self.split_segments(text)
+        translated = self._translate_segments([segment for segment, _ in segments])
+        return "".join(f"{result}{sep}" for result, (_, sep) in zip(translated, segments))
 
     def translate_list(self, items: List[str]) -> List[str]:
-        """Translates a list of strings."""
+        """Translates a list of strings, only sending translation-memory misses to the API."""
         try:
-            # deep-translator has translate_batch
-            return self.translator.translate_batch(items)
+            # Multi-line or oversized items go through the sentence splitter
+            simple = [i for i, item in enumerate(items)
+                      if item and "\n" not in item and len(item) <= TRANSLATION_CHUNK_CHARS]
+            results = list(items)
+            for i, translation in zip(simple, self._translate_segments([items[i] for i in simple])):
+                results[i] = translation
+            simple_set = set(simple)
+            for i, item in enumerate(items):
+                if item and i not in simple_set:
+                    results[i] = self.translate_to_english(item)
+            return results
         except Exception as e:
             print(f"List translation error: {e}")
             return items
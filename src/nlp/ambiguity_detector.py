@@ -1,7 +1,7 @@
-import re
 from typing import List, Dict, Any
-from src.config import OPENAI_API_KEY, LLM_MODEL
-import openai
+from src.core.registry import get_llm_gateway, get_llm_memo
+from src.core.prompt_builder import PromptBuilder
+from src.nlp.keyword_matcher import KeywordMatcher
 
 class AmbiguityDetector:
     """Detects vague or ambiguous language in contract clauses."""
@@ -13,38 +13,45 @@ class AmbiguityDetector:
         "ordinarily", "generally", "commonly", "fairly"
     ]
 
+    # Whole-word matcher built once instead of a fresh regex per term per call
+    TERM_MATCHER = KeywordMatcher(VAGUE_TERMS, whole_words=True)
+
+    PROMPT_TEMPLATE = """
+        Identify ambiguous, vague, or subjective terms in the following clause that could lead to disputes.
+        Explain why each term is ambiguous.
+        
+        Clause:
+        {text}
+        
+        Provide result in JSON format as a list of objects with 'term' and 'reason'.
+        """
+
     def __init__(self):
-        pass
+        self.prompt_builder = PromptBuilder()
 
     def detect_ambiguities_heuristic(self, text: str) -> List[str]:
         """Identifies vague terms using keyword matching."""
-        found = []
-        text_lower = text.lower()
-        for term in self.VAGUE_TERMS:
-            if re.search(r'\b' + term + r'\b', text_lower):
-                found.append(term)
-        return found
+        present = self.TERM_MATCHER.found(text)
+        return [term for term in self.VAGUE_TERMS if term in present]
 
     def detect_ambiguities_llm(self, text: str) -> List[Dict[str, str]]:
         """Uses LLM to detect more complex semantic ambiguities."""
-        if not OPENAI_API_KEY:
+        if not get_llm_gateway().is_available():
             terms = self.detect_ambiguities_heuristic(text)
             return [{"term": t, "reason": "Common vague term used in legal context."} for t in terms]
 
-        prompt = f"""
-        Identify ambiguous, vague, or subjective terms in the following clause that could lead to disputes.
-        Explain why each term is ambiguous.
-        
-        Clause:
-        {text}
-        
-        Provide result in JSON format as a list of objects with 'term' and 'reason'.
-        """
+        memo = get_llm_memo()
+        cached = memo.get("ambiguity_detection", self.PROMPT_TEMPLATE, text)
+        if cached is not None:
+            return cached
+
+        # The memo stays keyed on the full clause, so long clauses still hit it
+        prompt_text = self.prompt_builder.truncate(text, self.prompt_builder.budget("clause", self.PROMPT_TEMPLATE))
+        prompt = self.PROMPT_TEMPLATE.format(text=prompt_text)
 
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=LLM_MODEL,
+            response = get_llm_gateway().chat(
+                "ambiguity_detection",
                 messages=[
                     {"role": "system", "content": "You are a legal risk analyst. Output ONLY valid JSON."},
                     {"role": "user", "content": prompt}
@@ -53,7 +60,9 @@ class AmbiguityDetector:
             )
             import json
             data = json.loads(response.choices[0].message.content)
-            return data.get("ambiguities", data if isinstance(data, list) else [])
+            ambiguities = data.get("ambiguities", data if isinstance(data, list) else [])
+            memo.put("ambiguity_detection", self.PROMPT_TEMPLATE, text, ambiguities)
+            return ambiguities
         except Exception as e:
             print(f"LLM Ambiguity Detection error: {e}")
             terms = self.detect_ambiguities_heuristic(text)
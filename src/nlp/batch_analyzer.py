@@ -0,0 +1,151 @@
+import json
+from typing import Any, Dict, List, Optional
+from src.config import LLM_BATCH_SIZE, LLM_BATCH_TOKEN_BUDGET, PROMPT_OUTPUT_RESERVE
+from src.core.registry import get_llm_gateway, get_llm_memo
+from src.core.prompt_builder import PromptBuilder
+from src.nlp.clause_analyzer import ClauseAnalyzer
+from src.nlp.ambiguity_detector import AmbiguityDetector
+
+class BatchClauseAnalyzer:
+    """Analyzes several clauses per LLM request, splitting the answer back per clause.
+
+    Batch answers are memoized under the batch prompt, apart from the single-clause
+    answers, since they come from a different prompt.
+    """
+
+    PROMPT_TEMPLATE = """
+        For each numbered legal clause below:
+        1. Categorize it as 'Obligation', 'Right', or 'Prohibition'.
+        2. Provide a brief plain-language explanation.
+        3. Give a risk level (Low, Medium, High).
+        4. Identify ambiguous, vague, or subjective terms that could lead to disputes and explain why each term is ambiguous.
+        
+        Clauses:
+        {clauses}
+        
+        Provide result in JSON format with a key 'results' holding one object per clause, each with keys:
+        'id' (the clause number), 'category', 'explanation', 'risk_level', and 'ambiguities' (a list of objects with 'term' and 'reason').
+        """
+
+    CATEGORIES = {"Obligation", "Right", "Prohibition"}
+
+    def __init__(self, analyzer: Optional[ClauseAnalyzer] = None,
+                 ambiguity_detector: Optional[AmbiguityDetector] = None,
+                 batch_size: int = LLM_BATCH_SIZE, token_budget: int = LLM_BATCH_TOKEN_BUDGET):
+        self.analyzer = analyzer or ClauseAnalyzer()
+        self.ambiguity_detector = ambiguity_detector or AmbiguityDetector()
+        self.batch_size = max(1, batch_size)
+        self.prompt_builder = PromptBuilder()
+        # Never plan a batch the model's context window can't hold
+        self.token_budget = min(token_budget, self.prompt_builder.context_window()
+                                - PROMPT_OUTPUT_RESERVE - self.prompt_builder.count_tokens(self.PROMPT_TEMPLATE))
+        self.clause_budget = self.prompt_builder.budget("clause", self.PROMPT_TEMPLATE)
+
+    def _fit_clause(self, text: str) -> str:
+        return self.prompt_builder.truncate(text, self.clause_budget)
+
+    def make_batches(self, texts: List[str]) -> List[List[int]]:
+        """Groups clause indices into batches bounded by clause count and token budget."""
+        batches = []
+        current, current_tokens = [], 0
+        for idx, text in enumerate(texts):
+            tokens = self.prompt_builder.count_tokens(self._fit_clause(text))
+            if current and (len(current) >= self.batch_size or current_tokens + tokens > self.token_budget):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _validate(self, entry: Any) -> Optional[Dict[str, Any]]:
+        """Returns a per-clause result if the batch entry is well-formed, else None."""
+        if not isinstance(entry, dict):
+            return None
+        category = entry.get("category")
+        explanation = entry.get("explanation")
+        risk_level = entry.get("risk_level")
+        ambiguities = entry.get("ambiguities", [])
+        if category not in self.CATEGORIES or not isinstance(explanation, str) or not isinstance(risk_level, str):
+            return None
+        if not isinstance(ambiguities, list) or not all(
+            isinstance(a, dict) and "term" in a and "reason" in a for a in ambiguities
+        ):
+            return None
+        return {
+            "analysis": {"category": category, "explanation": explanation, "risk_level": risk_level},
+            "ambiguities": ambiguities
+        }
+
+    def analyze_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Sends one request for a batch; malformed or missing clauses come back as None."""
+        clauses = "\n\n".join(f"[Clause {i}]\n{self._fit_clause(text)}" for i, text in enumerate(texts, 1))
+        prompt = self.PROMPT_TEMPLATE.format(clauses=clauses)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+
+        try:
+            response = get_llm_gateway().chat(
+                "batch_clause_analysis",
+                messages=[
+                    {"role": "system", "content": "You are a legal expert analyzer. Output ONLY valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+            data = json.loads(response.choices[0].message.content)
+            entries = data.get("results", []) if isinstance(data, dict) else []
+        except Exception as e:
+            print(f"LLM Batch Clause Analysis error: {e}")
+            return results
+
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                position = int(entry.get("id")) - 1
+            except (AttributeError, TypeError, ValueError):
+                continue
+            if 0 <= position < len(texts) and results[position] is None:
+                results[position] = self._validate(entry)
+        return results
+
+    def _analyze_single(self, text: str) -> Dict[str, Any]:
+        """Single-clause fallback using the regular per-clause calls."""
+        return {
+            "analysis": self.analyzer.analyze_clause(text),
+            "ambiguities": self.ambiguity_detector.detect_ambiguities_llm(text)
+        }
+
+    def analyze_clauses(self, texts: List[str], executor=None) -> List[Dict[str, Any]]:
+        """Analyzes all clauses, returning {'analysis', 'ambiguities'} per clause in input order."""
+        if not get_llm_gateway().is_available():
+            return [self._analyze_single(text) for text in texts]
+
+        memo = get_llm_memo()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        pending = []
+        for idx, text in enumerate(texts):
+            # One lookup per clause; fallback clauses are looked up by the single-clause stages
+            results[idx] = memo.get("batch_clause_analysis", self.PROMPT_TEMPLATE, text)
+            if results[idx] is None:
+                pending.append(idx)
+
+        batches = [[pending[i] for i in batch] for batch in self.make_batches([texts[i] for i in pending])]
+        run_batch = lambda batch: self.analyze_batch([texts[i] for i in batch])
+        batch_outputs = executor.map(run_batch, batches) if executor else [run_batch(b) for b in batches]
+
+        fallback = []
+        for batch, outputs in zip(batches, batch_outputs):
+            for idx, result in zip(batch, outputs):
+                if result is None:
+                    fallback.append(idx)
+                    continue
+                memo.put("batch_clause_analysis", self.PROMPT_TEMPLATE, texts[idx], result)
+                results[idx] = result
+
+        if fallback:
+            run_single = lambda idx: self._analyze_single(texts[idx])
+            singles = executor.map(run_single, fallback) if executor else [run_single(i) for i in fallback]
+            for idx, result in zip(fallback, singles):
+                results[idx] = result
+
+        return results
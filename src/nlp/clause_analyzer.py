@@ -1,20 +1,12 @@
-import openai
 from typing import Dict, Any, List
-from src.config import OPENAI_API_KEY, LLM_MODEL
+from src.core.registry import get_llm_gateway, get_llm_memo
+from src.core.prompt_builder import PromptBuilder
+from src.nlp.keyword_matcher import KeywordMatcher
 
 class ClauseAnalyzer:
     """Analyzes individual clauses for rights, obligations, and prohibitions."""
     
-    def __init__(self):
-        if OPENAI_API_KEY:
-            openai.api_key = OPENAI_API_KEY
-
-    def analyze_clause(self, clause_text: str) -> Dict[str, Any]:
-        """Analyzes a clause to determine if it's an obligation, right, or prohibition."""
-        if not OPENAI_API_KEY:
-            return self._analyze_heuristic(clause_text)
-
-        prompt = f"""
+    PROMPT_TEMPLATE = """
         Analyze the following legal clause and categorize it as 'Obligation', 'Right', or 'Prohibition'.
         Also provide a brief plain-language explanation and a risk level (Low, Medium, High).
         
@@ -23,11 +15,36 @@ class ClauseAnalyzer:
         
         Provide result in JSON format with keys: 'category', 'explanation', 'risk_level'.
         """
+    
+    OBLIGATION_TERMS = ["shall", "must", "agrees to", "undertakes"]
+    RIGHT_TERMS = ["may", "has the right", "is entitled to"]
+    PROHIBITION_TERMS = ["shall not", "must not", "prohibited", "will not"]
+    RISK_TERMS = ["indemnify", "penalty", "liable", "terminate"]
+    
+    TERM_MATCHER = KeywordMatcher(OBLIGATION_TERMS + RIGHT_TERMS + PROHIBITION_TERMS + RISK_TERMS)
+    
+    def __init__(self):
+        self.prompt_builder = PromptBuilder()
+
+    def analyze_clause(self, clause_text: str) -> Dict[str, Any]:
+        """Analyzes a clause to determine if it's an obligation, right, or prohibition."""
+        if not get_llm_gateway().is_available():
+            return self._analyze_heuristic(clause_text)
+
+        # Identical boilerplate clauses across contracts reuse the earlier response
+        memo = get_llm_memo()
+        cached = memo.get("clause_analysis", self.PROMPT_TEMPLATE, clause_text)
+        if cached is not None:
+            return cached
+
+        # Over-long clauses are cut at a token boundary rather than overflowing the context
+        # (the memo stays keyed on the full clause, so long clauses still hit it)
+        prompt_text = self.prompt_builder.truncate(clause_text, self.prompt_builder.budget("clause", self.PROMPT_TEMPLATE))
+        prompt = self.PROMPT_TEMPLATE.format(clause_text=prompt_text)
 
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=LLM_MODEL,
+            response = get_llm_gateway().chat(
+                "clause_analysis",
                 messages=[
                     {"role": "system", "content": "You are a legal expert analyzer. Output ONLY valid JSON."},
                     {"role": "user", "content": prompt}
@@ -35,25 +52,27 @@ class ClauseAnalyzer:
                 response_format={"type": "json_object"}
             )
             import json
-            return json.loads(response.choices[0].message.content)
+            result = json.loads(response.choices[0].message.content)
+            memo.put("clause_analysis", self.PROMPT_TEMPLATE, clause_text, result)
+            return result
         except Exception as e:
             print(f"LLM Clause Analysis error: {e}")
             return self._analyze_heuristic(clause_text)
 
     def _analyze_heuristic(self, text: str) -> Dict[str, Any]:
         """Simple heuristic-based analysis fallback."""
-        text_lower = text.lower()
+        found = self.TERM_MATCHER.found(text)
         category = "Obligation"
         risk_level = "Low"
         
-        if any(w in text_lower for w in ["shall", "must", "agrees to", "undertakes"]):
+        if any(w in found for w in self.OBLIGATION_TERMS):
             category = "Obligation"
-        elif any(w in text_lower for w in ["may", "has the right", "is entitled to"]):
+        elif any(w in found for w in self.RIGHT_TERMS):
             category = "Right"
-        elif any(w in text_lower for w in ["shall not", "must not", "prohibited", "will not"]):
+        elif any(w in found for w in self.PROHIBITION_TERMS):
             category = "Prohibition"
             
-        if any(w in text_lower for w in ["indemnify", "penalty", "liable", "terminate"]):
+        if any(w in found for w in self.RISK_TERMS):
             risk_level = "Medium"
         
         return {
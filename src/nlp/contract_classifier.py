@@ -1,11 +1,23 @@
 import re
-import openai
 from typing import Optional
-from src.config import CONTRACT_TYPES, OPENAI_API_KEY, LLM_MODEL
+from src.config import CONTRACT_TYPES
+from src.core.registry import get_llm_gateway
+from src.core.prompt_builder import PromptBuilder
+from src.nlp.keyword_matcher import KeywordMatcher
 
 class ContractClassifier:
     """Classifies the type of contract from its text."""
     
+    PROMPT_TEMPLATE = """
+        Classify the following contract snippet into one of these categories:
+        {categories}
+        If none match, return 'General Agreement'.
+        
+        Contract Content:
+        {sample_text}
+        
+        Result:"""
+    
     # Keyword-based heuristics for quick classification
     KEYWORDS = {
         "Employment Agreement": ["employment", "employee", "employer", "salary", "bonus", "role", "position"],
@@ -15,19 +27,19 @@ class ContractClassifier:
         "Service Contract": ["service", "client", "deliverables", "milestones", "statement of work", "consultancy"]
     }
 
+    # One shared matcher for every contract type's keywords
+    KEYWORD_MATCHER = KeywordMatcher(kw for keywords in KEYWORDS.values() for kw in keywords)
+
     def __init__(self):
-        if OPENAI_API_KEY:
-            openai.api_key = OPENAI_API_KEY
+        self.prompt_builder = PromptBuilder()
 
     def classify_heuristic(self, text: str) -> Optional[str]:
         """Classifies contract using keyword matching."""
-        text_lower = text.lower()
+        found = self.KEYWORD_MATCHER.found(text)
         scores = {ct: 0 for ct in CONTRACT_TYPES}
         
         for ct, keywords in self.KEYWORDS.items():
-            for kw in keywords:
-                if kw in text_lower:
-                    scores[ct] += 1
+            scores[ct] += sum(1 for kw in keywords if kw in found)
         
         best_match = max(scores, key=scores.get)
         if scores[best_match] > 0:
@@ -36,26 +48,17 @@ class ContractClassifier:
 
     def classify_llm(self, text: str) -> str:
         """Classifies contract using LLM for higher accuracy."""
-        if not OPENAI_API_KEY:
+        if not get_llm_gateway().is_available():
             return self.classify_heuristic(text) or "General Agreement"
 
-        # Use only first 2000 chars for classification to save tokens
-        sample_text = text[:2000]
-        
-        prompt = f"""
-        Classify the following contract snippet into one of these categories:
-        {', '.join(CONTRACT_TYPES)}
-        If none match, return 'General Agreement'.
+        # Opening section plus the sections richest in contract-type keywords, within budget
+        sample_text = self.prompt_builder.fit("classification", text, self.PROMPT_TEMPLATE, self.KEYWORD_MATCHER)
         
-        Contract Content:
-        {sample_text}
-        
-        Result:"""
+        prompt = self.PROMPT_TEMPLATE.format(categories=', '.join(CONTRACT_TYPES), sample_text=sample_text)
 
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=LLM_MODEL,
+            response = get_llm_gateway().chat(
+                "classification",
                 messages=[
                     {"role": "system", "content": "You are a legal assistant specializing in contract classification."},
                     {"role": "user", "content": prompt}
@@ -0,0 +1,52 @@
+import re
+import zlib
+from typing import List
+import numpy as np
+from src.config import CLAUSE_EMBEDDING_DIM
+
+class SpacyEmbedder:
+    """Averaged static word vectors from the shared spaCy model (tokenizer only, no pipeline run)."""
+
+    def __init__(self, nlp=None):
+        if nlp is None:
+            from src.core.registry import get_spacy_nlp
+            nlp = get_spacy_nlp()
+        self.nlp = nlp
+        self.dim = nlp.vocab.vectors_length
+        self.name = f"spacy:{nlp.meta.get('name', 'model')}:{self.dim}"
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        return np.array([self.nlp.make_doc(text).vector for text in texts], dtype=np.float32).reshape(len(texts), self.dim)
+
+class HashingEmbedder:
+    """Word and bigram feature hashing, for models without word vectors (en_core_web_sm, blank).
+
+    crc32 rather than hash() so vectors are identical across processes.
+    """
+
+    TOKEN_REGEX = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dim: int = CLAUSE_EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hashing:{dim}"
+
+    def __call__(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = self.TOKEN_REGEX.findall(text.lower())
+            for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+                digest = zlib.crc32(feature.encode("utf-8"))
+                # Signed hashing keeps collisions from only ever adding up
+                vectors[row, digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        return vectors
+
+def default_embedder():
+    """spaCy vectors when the configured model has them (the default en_core_web_lg, or md),
+    feature hashing otherwise (sm, or a blank pipeline when no model is installed)."""
+    try:
+        embedder = SpacyEmbedder()
+        if embedder.dim > 0:
+            return embedder
+    except Exception as e:
+        print(f"spaCy embedder unavailable, using feature hashing: {e}")
+    return HashingEmbedder()
@@ -1,25 +1,81 @@
-import spacy
+import json
 import re
-from typing import Dict, List, Any
-from src.config import OPENAI_API_KEY, LLM_MODEL
-import openai
+from typing import Dict, List, Any, Optional
+from src.config import SPACY_CHUNK_CHARS, SPACY_BATCH_SIZE, SPACY_N_PROCESS, ENTITY_INCLUDE_SPACY, ENTITY_RULES_PREPASS
+from src.core.registry import get_llm_gateway, get_spacy_nlp
+from src.core.prompt_builder import PromptBuilder
+from src.core.tracing import span
+from src.nlp.keyword_matcher import KeywordMatcher
+from src.nlp.structured_extractor import StructuredExtractor
+from src.pipeline.executor import ClauseExecutor
 
 class EntityExtractor:
     """Extracts key legal entities from contract text."""
     
-    def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_lg")
-        except:
-            # Fallback if model not downloaded
-            import os
-            os.system("python -m spacy download en_core_web_lg")
-            self.nlp = spacy.load("en_core_web_lg")
+    PROMPT_TEMPLATE = """
+        Extract the following information from this contract:
+        {fields}
+        
+        Contract Content:
+        {sample_text}
+        
+        Provide the result in JSON format with the keys: {keys}.
+        """
+    
+    # How each structured_data field is described to the LLM
+    FIELD_PROMPTS = {
+        "Parties": "Parties (Names of companies/individuals)",
+        "Effective Date": "Effective Date",
+        "Total Value/Financial Obligations": "Total Value/Financial Obligations (if mentioned)",
+        "Termination Notice Period": "Termination Notice Period",
+        "Governing Law/Jurisdiction": "Governing Law/Jurisdiction",
+    }
+    
+    # Sections mentioning these are where the requested fields usually live
+    SECTION_MATCHER = KeywordMatcher([
+        "between", "parties", "dated", "effective", "commence", "rs.", "inr", "₹", "lakh", "crore",
+        "payment", "consideration", "notice", "terminat", "governing law", "jurisdiction", "courts"
+    ])
+    
+    def __init__(self, nlp=None):
+        # Shared pipeline (NER components of SPACY_MODEL) - loaded once per process by the registry
+        self.nlp = nlp if nlp is not None else get_spacy_nlp()
+        self.prompt_builder = PromptBuilder()
+        self.rule_extractor = StructuredExtractor()
+
+    @staticmethod
+    def split_chunks(text: str, limit: int = SPACY_CHUNK_CHARS) -> List[str]:
+        """Packs paragraphs into chunks of at most limit characters.
+
+        Oversized paragraphs are split on lines, and over-long lines on whitespace.
+        """
+        pieces = []
+        for paragraph in re.split(r'\n\s*\n', text):
+            for line in (paragraph.split("\n") if len(paragraph) > limit else [paragraph]):
+                line = line.strip()
+                while len(line) > limit:
+                    cut = line.rfind(" ", 0, limit)
+                    cut = cut if cut > 0 else limit
+                    pieces.append(line[:cut])
+                    line = line[cut:].lstrip()
+                if line:
+                    pieces.append(line)
+
+        chunks, current = [], ""
+        for piece in pieces:
+            if current and len(current) + 2 + len(piece) > limit:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current}\n\n{piece}" if current else piece
+        if current:
+            chunks.append(current)
+        return chunks
 
     def extract_entities_spacy(self, text: str) -> Dict[str, List[str]]:
         """Extracts organizations, dates, and amounts using spaCy."""
-        # Process first 100k chars for performance
-        doc = self.nlp(text[:100000])
+        # The whole document is covered, streamed through nlp.pipe in paragraph chunks
+        docs = self.nlp.pipe(self.split_chunks(text), batch_size=SPACY_BATCH_SIZE, n_process=SPACY_N_PROCESS)
         
         entities = {
             "Parties": [],
@@ -28,15 +84,16 @@ class EntityExtractor:
             "Jurisdictions": []
         }
         
-        for ent in doc.ents:
-            if ent.label_ in ["ORG", "PERSON"]:
-                entities["Parties"].append(ent.text)
-            elif ent.label_ == "DATE":
-                entities["Dates"].append(ent.text)
-            elif ent.label_ == "MONEY":
-                entities["Monetary Amounts"].append(ent.text)
-            elif ent.label_ == "GPE":
-                entities["Jurisdictions"].append(ent.text)
+        for doc in docs:
+            for ent in doc.ents:
+                if ent.label_ in ["ORG", "PERSON"]:
+                    entities["Parties"].append(ent.text)
+                elif ent.label_ == "DATE":
+                    entities["Dates"].append(ent.text)
+                elif ent.label_ == "MONEY":
+                    entities["Monetary Amounts"].append(ent.text)
+                elif ent.label_ == "GPE":
+                    entities["Jurisdictions"].append(ent.text)
         
         # Deduplicate
         for k in entities:
@@ -46,49 +103,83 @@ class EntityExtractor:
 
     def extract_entities_llm(self, text: str) -> Dict[str, Any]:
         """Extracts key structured data using LLM for higher precision."""
-        if not OPENAI_API_KEY:
-            return self.extract_entities_spacy(text)
+        structured = self._query_llm(text) if get_llm_gateway().is_available() else None
+        return structured if structured is not None else self.extract_entities_spacy(text)
 
-        # Use first 3000 chars - usually contains parties and basic terms
-        sample_text = text[:3000]
-        
-        prompt = f"""
-        Extract the following information from this contract:
-        1. Parties (Names of companies/individuals)
-        2. Effective Date
-        3. Total Value/Financial Obligations (if mentioned)
-        4. Termination Notice Period
-        5. Governing Law/Jurisdiction
+    def _query_llm(self, text: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """Asks the LLM for the given structured fields (default all); None if the call or its JSON fails."""
+        fields = fields or StructuredExtractor.FIELDS
+        # Opening section (parties, date) plus the payment, notice and jurisdiction sections
+        sample_text = self.prompt_builder.fit("entities", text, self.PROMPT_TEMPLATE, self.SECTION_MATCHER)
         
-        Contract Content:
-        {sample_text}
-        
-        Provide the result in JSON format.
-        """
+        prompt = self.PROMPT_TEMPLATE.format(
+            fields="\n        ".join(f"{i}. {self.FIELD_PROMPTS[field]}" for i, field in enumerate(fields, 1)),
+            keys=", ".join(f'"{field}"' for field in fields),
+            sample_text=sample_text
+        )
 
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=LLM_MODEL,
+            response = get_llm_gateway().chat(
+                "entity_extraction",
                 messages=[
                     {"role": "system", "content": "You are a legal assistant that extracts structured data from contracts. Output ONLY valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
                 response_format={"type": "json_object"}
             )
-            import json
             return json.loads(response.choices[0].message.content)
         except Exception as e:
             print(f"LLM Entity Extraction error: {e}")
+            return None
+
+    def _spacy_pass(self, text: str) -> Dict[str, List[str]]:
+        with span("entities.spacy"):
             return self.extract_entities_spacy(text)
 
-    def extract(self, text: str) -> Dict[str, Any]:
-        """Main extraction method."""
-        spacy_ents = self.extract_entities_spacy(text)
-        llm_ents = self.extract_entities_llm(text)
+    def _llm_pass(self, text: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        with span("entities.llm"):
+            return self._query_llm(text, fields)
+
+    def extract(self, text: str, include_spacy: bool = ENTITY_INCLUDE_SPACY,
+                use_rules: bool = ENTITY_RULES_PREPASS) -> Dict[str, Any]:
+        """Main extraction method.
+
+        The rule-based pre-pass fills the fields it finds with context-anchored matches,
+        and the LLM is asked only for the remaining fields (not at all if none remain).
+        Weaker rule guesses are used only when the LLM can't answer. spaCy runs at most once: for its own
+        entities (include_spacy) or as the fallback when the LLM is unavailable or fails.
+        When spaCy and the LLM are both needed they run concurrently. spacy_entities is
+        None if spaCy was never needed.
+        """
+        rules = {}
+        if use_rules:
+            with span("entities.rules"):
+                rules = self.rule_extractor.extract(text)
+        missing = [field for field in StructuredExtractor.FIELDS if field not in rules]
+        
+        spacy_ents, llm_ents = None, None
+        if missing and get_llm_gateway().is_available():
+            if include_spacy:
+                spacy_ents, llm_ents = ClauseExecutor(max_workers=2).map(
+                    lambda run_pass: run_pass(text), [self._spacy_pass, lambda t: self._llm_pass(t, missing)]
+                )
+            else:
+                llm_ents = self._llm_pass(text, missing)
+        elif include_spacy:
+            spacy_ents = self._spacy_pass(text)
+        
+        if llm_ents is not None:
+            structured = {**llm_ents, **rules}
+        elif not missing:
+            structured = rules
+        else:
+            # The LLM couldn't answer - spaCy's entities and the rules' guesses stand in
+            if spacy_ents is None:
+                spacy_ents = self._spacy_pass(text)
+            guesses = self.rule_extractor.extract(text, guesses=True) if use_rules else {}
+            structured = {**spacy_ents, **guesses}
         
-        # Merge results - prefer LLM for structure
         return {
             "spacy_entities": spacy_ents,
-            "structured_data": llm_ents
+            "structured_data": structured
         }
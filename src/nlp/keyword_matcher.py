@@ -0,0 +1,71 @@
+"""Multi-keyword matching over contract text.
+
+This used to be a single-pass Aho-Corasick automaton. Walking it one character at a
+time in Python was slower than a str.find scan per keyword for the short keyword lists
+used here. The cost is now O(keywords x text length) rather than O(text length), so a
+list of hundreds of keywords would need a C-backed automaton again.
+"""
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+class KeywordMatcher:
+    """Finds every keyword occurrence, including overlapping ones, with C-speed substring scans.
+
+    The text is lowercased once and each keyword is located with str.find, so a scan
+    costs a few memchr-style passes rather than a Python loop per character. Keyword
+    lists here are short, which keeps that well ahead of a pure-Python automaton.
+    Matching is case-insensitive; positions refer to the lowercased text, which lines up
+    with the original for the scripts this project handles.
+    """
+
+    def __init__(self, keywords: Iterable[str], whole_words: bool = False):
+        self.keywords = list(dict.fromkeys(kw.lower() for kw in keywords if kw))
+        self.whole_words = whole_words
+
+    @staticmethod
+    def _is_word_char(ch: str) -> bool:
+        return ch.isalnum() or ch == "_"
+
+    def _at_boundary(self, text: str, index: int) -> bool:
+        """Mirrors regex \\b: word-ness differs on either side of index."""
+        before = index > 0 and self._is_word_char(text[index - 1])
+        after = index < len(text) and self._is_word_char(text[index])
+        return before != after
+
+    def _occurrences(self, text: str, keyword: str) -> Iterator[int]:
+        """Start offsets of keyword in the lowercased text, overlapping ones included."""
+        start = text.find(keyword)
+        while start != -1:
+            end = start + len(keyword)
+            if not self.whole_words or (self._at_boundary(text, start) and self._at_boundary(text, end)):
+                yield start
+            start = text.find(keyword, start + 1)
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, str]]:
+        """Yields (start, end, keyword) for every occurrence, in order of end offset
+        (longer keywords first when several end at the same offset)."""
+        text = text.lower()
+        matches = [(start + len(kw), -len(kw), kw) for kw in self.keywords for start in self._occurrences(text, kw)]
+        for end, negative_length, keyword in sorted(matches):
+            yield end + negative_length, end, keyword
+
+    def find_all(self, text: str) -> List[Tuple[int, int, str]]:
+        """Returns every (start, end, keyword) occurrence in text order (by start, then end)."""
+        return sorted(self.iter_matches(text))
+
+    def counts(self, text: str) -> Dict[str, int]:
+        """Returns the number of occurrences of each keyword (zero if absent)."""
+        text = text.lower()
+        return {kw: sum(1 for _ in self._occurrences(text, kw)) for kw in self.keywords}
+
+    def positions(self, text: str) -> Dict[str, List[int]]:
+        """Returns the start offsets of each keyword that occurs in the text."""
+        text = text.lower()
+        result = {kw: list(self._occurrences(text, kw)) for kw in self.keywords}
+        return {kw: starts for kw, starts in result.items() if starts}
+
+    def found(self, text: str) -> Set[str]:
+        """Returns the set of keywords present in the text."""
+        text = text.lower()
+        if not self.whole_words:
+            return {kw for kw in self.keywords if kw in text}
+        return {kw for kw in self.keywords if next(self._occurrences(text, kw), None) is not None}
@@ -1,5 +1,5 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable, Iterator
 
 class ClauseExtractor:
     """Extracts clauses and sections from contract text."""
@@ -13,59 +13,94 @@ class ClauseExtractor:
         r'^\s*\([a-z\d]+\)',                                      # (a), (1), (i)
     ]
 
+    HEADER_REGEX = re.compile('|'.join(CLAUSE_PATTERNS), re.MULTILINE | re.IGNORECASE)
+    
+    # Nesting level patterns, checked in order
+    LEVEL_PATTERNS = [
+        (re.compile(r'^\s*(?:Article|Section)\s+\d+', re.I), 1),
+        (re.compile(r'^\s*\d+\.\s'), 1),
+        (re.compile(r'^\s*\d+\.\d+'), 2),
+        (re.compile(r'^\s*\([a-z\d]+\)'), 3),
+    ]
+    
+    LINE_REGEX = re.compile(r'[^\n]+')
+
     def __init__(self):
-        self.regex = re.compile('|'.join(self.CLAUSE_PATTERNS), re.MULTILINE | re.IGNORECASE)
+        self.regex = self.HEADER_REGEX
 
     def extract_clauses(self, text: str) -> List[Dict[str, Any]]:
-        """Splits text into a list of clauses with metadata."""
-        lines = text.split('\n')
-        clauses = []
-        current_clause = None
+        """Splits text into a list of clauses with metadata.
+
+        Each clause carries 'start'/'end' (the whole clause, header included) and
+        'content_start'/'content_end' character offsets into the source text.
+        """
+        return list(self.iter_clauses([text]))
+
+    def iter_clauses(self, blocks: Iterable[str]) -> Iterator[Dict[str, Any]]:
+        """Yields clauses as soon as they are complete while consuming line-aligned text blocks.
+
+        Accepts the output of DocumentParser.iter_blocks so clause detection overlaps extraction.
+        Offsets refer to the blocks joined with newlines.
+        """
+        current = None
+        block_offset = 0
         
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-                
-            # Check if line matches a clause header pattern
-            if self.regex.match(line):
-                if current_clause:
-                    clauses.append(current_clause)
-                
-                # Start a new clause
-                current_clause = {
-                    "header": line,
-                    "content": "",
-                    "level": self._determine_level(line)
-                }
-            else:
-                if current_clause:
-                    current_clause["content"] += line + " "
-                else:
-                    # Content before any clause (introduction/preamble)
-                    current_clause = {
-                        "header": "Preamble/Introduction",
-                        "content": line + " ",
-                        "level": 0
+        for block in blocks:
+            for match in self.LINE_REGEX.finditer(block):
+                raw_line = match.group()
+                line = raw_line.strip()
+                if not line:
+                    continue
+                start = block_offset + match.start() + (len(raw_line) - len(raw_line.lstrip()))
+                end = start + len(line)
+                    
+                # Check if line matches a clause header pattern
+                if self.regex.match(line):
+                    if current:
+                        yield self._finish(current)
+                    
+                    # Start a new clause
+                    current = {
+                        "header": line,
+                        "level": self._determine_level(line),
+                        "start": start,
+                        "end": end,
+                        "lines": [],
+                        "content_start": end,
+                        "content_end": end
                     }
-        
-        if current_clause:
-            clauses.append(current_clause)
-            
-        # Refine content
-        for clause in clauses:
-            clause["content"] = clause["content"].strip()
+                else:
+                    if not current:
+                        # Content before any clause (introduction/preamble)
+                        current = {
+                            "header": "Preamble/Introduction",
+                            "level": 0,
+                            "start": start,
+                            "end": end,
+                            "lines": [],
+                            "content_start": start,
+                            "content_end": start
+                        }
+                    if not current["lines"]:
+                        current["content_start"] = start
+                    current["lines"].append(line)
+                    current["end"] = current["content_end"] = end
             
-        return clauses
+            block_offset += len(block) + 1
+        
+        if current:
+            yield self._finish(current)
+
+    @staticmethod
+    def _finish(clause: Dict[str, Any]) -> Dict[str, Any]:
+        """Builds the clause content with a single join over its stripped lines."""
+        lines = clause.pop("lines")
+        clause["content"] = " ".join(lines)
+        return clause
 
     def _determine_level(self, header: str) -> int:
         """Heuristic to determine clause nesting level."""
-        if re.match(r'^\s*(?:Article|Section)\s+\d+', header, re.I):
-            return 1
-        if re.match(r'^\s*\d+\.\s', header):
-            return 1
-        if re.match(r'^\s*\d+\.\d+', header):
-            return 2
-        if re.match(r'^\s*\([a-z\d]+\)', header):
-            return 3
+        for pattern, level in self.LEVEL_PATTERNS:
+            if pattern.match(header):
+                return level
         return 1
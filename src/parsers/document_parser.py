@@ -1,36 +1,94 @@
 import os
+import re
 import pdfplumber
 import docx
-from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Iterator
+from src.config import PDF_WORKERS, PDF_PARALLEL_MIN_PAGES
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[str]:
+    """Worker process: opens the PDF independently and extracts pages [start, end)."""
+    texts = []
+    with pdfplumber.open(file_path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or "")
+            page.close()
+    return texts
 
 class DocumentParser:
     """Handles text extraction from various document formats (PDF, DOCX, TXT)."""
     
+    @staticmethod
+    def iter_pages(file_path: str) -> Iterator[str]:
+        """Yields the text of each PDF page as soon as it is extracted."""
+        with pdfplumber.open(file_path) as pdf:
+            for page in pdf.pages:
+                page_text = page.extract_text()
+                # Drop the page's cached layout objects so memory stays flat on long documents
+                page.close()
+                if page_text:
+                    yield page_text
+
     @staticmethod
     def parse_pdf(file_path: str) -> str:
         """Extracts text from a PDF file using pdfplumber for better structure retention."""
-        text = ""
+        pages = []
+        try:
+            for page_text in DocumentParser.iter_pages(file_path):
+                pages.append(page_text + "\n")
+        except Exception as e:
+            print(f"Error parsing PDF {file_path}: {e}")
+        return "".join(pages)
+
+    @staticmethod
+    def parse_pdf_parallel(file_path: str, workers: int = PDF_WORKERS,
+                           min_pages: int = PDF_PARALLEL_MIN_PAGES) -> str:
+        """Extracts PDF text by sharding the page range across a process pool.
+
+        Falls back to the serial parser for small files or a single worker.
+        """
+        if workers <= 1:
+            return DocumentParser.parse_pdf(file_path)
         try:
             with pdfplumber.open(file_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text += page_text + "\n"
+                page_count = len(pdf.pages)
         except Exception as e:
             print(f"Error parsing PDF {file_path}: {e}")
-        return text
+            return ""
+        if page_count < min_pages:
+            return DocumentParser.parse_pdf(file_path)
+
+        # Two shards per worker keeps cores busy when some pages are slower than others
+        shard_count = min(page_count, workers * 2)
+        bounds = [round(i * page_count / shard_count) for i in range(shard_count + 1)]
+        shards = list(zip(bounds[:-1], bounds[1:]))
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                shard_texts = pool.map(_extract_page_range, [file_path] * len(shards),
+                                       [start for start, _ in shards], [end for _, end in shards])
+                # map yields shards in submission order, so pages stay in document order
+                return "".join(text + "\n" for texts in shard_texts for text in texts if text)
+        except Exception as e:
+            print(f"Parallel PDF extraction failed for {file_path}, using serial path: {e}")
+            return DocumentParser.parse_pdf(file_path)
+
+    @staticmethod
+    def iter_paragraphs(file_path: str) -> Iterator[str]:
+        """Yields the text of each DOCX paragraph."""
+        doc = docx.Document(file_path)
+        for para in doc.paragraphs:
+            yield para.text
 
     @staticmethod
     def parse_docx(file_path: str) -> str:
         """Extracts text from a DOCX file."""
-        text = ""
+        paragraphs = []
         try:
-            doc = docx.Document(file_path)
-            for para in doc.paragraphs:
-                text += para.text + "\n"
+            for para_text in DocumentParser.iter_paragraphs(file_path):
+                paragraphs.append(para_text + "\n")
         except Exception as e:
             print(f"Error parsing DOCX {file_path}: {e}")
-        return text
+        return "".join(paragraphs)
 
     @staticmethod
     def parse_txt(file_path: str) -> str:
@@ -45,11 +103,54 @@ class DocumentParser:
             print(f"Error parsing TXT {file_path}: {e}")
             return ""
 
+    def iter_blocks(self, file_path: str) -> Iterator[str]:
+        """Yields a document's text incrementally (pages, paragraphs or the whole TXT file).
+
+        Blocks are line-aligned, so joining them with newlines reproduces the document.
+        Read errors propagate, so a failed read never passes for a complete document.
+        """
+        ext = os.path.splitext(file_path)[1].lower()
+        if ext == '.pdf':
+            yield from self.iter_pages(file_path)
+        elif ext in ['.doc', '.docx']:
+            yield from self.iter_paragraphs(file_path)
+        elif ext == '.txt':
+            yield self.parse_txt(file_path)
+        else:
+            raise ValueError(f"Unsupported file format: {ext}")
+
+    def iter_clean_blocks(self, file_path: str) -> Iterator[str]:
+        """Yields the cleaned document in line-aligned pieces while it is still being read.
+
+        Joining the pieces with newlines gives clean_text() of the whole document. Cleaning
+        only rewrites whitespace runs, so each piece is cut at the end of a line of text,
+        where no run can straddle the cut.
+        """
+        pending, ready = "", None
+        for block in self.iter_blocks(file_path):
+            pending += block + "\n"
+            end = len(pending.rstrip())
+            if end == 0:
+                continue
+            cut = pending.find("\n", end)
+            piece = self._collapse_whitespace(pending[:cut])
+            pending = pending[cut:]
+            if ready is None:
+                piece = piece.lstrip()
+            else:
+                # The piece is only final once more text follows; the last one is stripped
+                yield ready
+                # Drop the newline that joins it to the previous piece
+                piece = piece[1:]
+            ready = piece
+        if ready is not None:
+            yield ready.rstrip()
+
     def parse(self, file_path: str) -> str:
         """Main method to parse a document based on its extension."""
         ext = os.path.splitext(file_path)[1].lower()
         if ext == '.pdf':
-            return self.parse_pdf(file_path)
+            return self.parse_pdf_parallel(file_path)
         elif ext in ['.doc', '.docx']:
             return self.parse_docx(file_path)
         elif ext == '.txt':
@@ -58,11 +159,13 @@ class DocumentParser:
             raise ValueError(f"Unsupported file format: {ext}")
 
     @staticmethod
-    def clean_text(text: str) -> str:
-        """Basic text cleaning."""
+    def _collapse_whitespace(text: str) -> str:
         # Replace multiple newlines with a single newline (or double for paragraph separation)
-        import re
         text = re.sub(r'\n\s*\n', '\n\n', text)
         # Remove excessive whitespace
-        text = re.sub(r' +', ' ', text)
-        return text.strip()
+        return re.sub(r' +', ' ', text)
+
+    @staticmethod
+    def clean_text(text: str) -> str:
+        """Basic text cleaning."""
+        return DocumentParser._collapse_whitespace(text).strip()
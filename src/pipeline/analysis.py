@@ -0,0 +1,258 @@
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from src.parsers.document_parser import DocumentParser
+from src.parsers.clause_extractor import ClauseExtractor
+from src.nlp.contract_classifier import ContractClassifier
+from src.nlp.entity_extractor import EntityExtractor
+from src.nlp.clause_analyzer import ClauseAnalyzer
+from src.nlp.ambiguity_detector import AmbiguityDetector
+from src.nlp.batch_analyzer import BatchClauseAnalyzer
+from src.risk.risk_detector import RiskDetector
+from src.risk.risk_scorer import RiskScorer
+from src.risk.compliance_checker import ComplianceChecker
+from src.legal.alternative_suggester import AlternativeSuggester
+from src.multilingual.language_detector import LanguageDetector
+from src.multilingual.translator import ContractTranslator
+from src.data.audit_logger import AuditLogger
+from src.data.result_cache import ResultCache
+from src.data.clause_index import ClauseIndex
+from src.pipeline.executor import ClauseExecutor
+from src.core.tracing import Trace, span
+from src.core.registry import get_clause_index
+from src.config import LLM_BATCH_MODE, CLAUSE_INDEX_ENABLED, PDF_WORKERS
+
+class AnalysisPipeline:
+    """Runs the full contract analysis without any UI dependencies.
+
+    Components are built once per pipeline, so batch runs can reuse one instance
+    for many documents. With cache=False the result cache is neither read nor written;
+    with index=False clauses are not added to the semantic clause index.
+    """
+
+    def __init__(self, audit: bool = True, cache: bool = True, index: bool = CLAUSE_INDEX_ENABLED):
+        self.audit = audit
+        self.cache = cache
+        self.parser = DocumentParser()
+        self.result_cache = ResultCache()
+        self.lang_detector = LanguageDetector()
+        self.translator = ContractTranslator()
+        self.classifier = ContractClassifier()
+        self.entity_extractor = EntityExtractor()
+        self.extractor = ClauseExtractor()
+        self.analyzer = ClauseAnalyzer()
+        self.ambiguity_detector = AmbiguityDetector()
+        self.risk_detector = RiskDetector()
+        self.risk_scorer = RiskScorer()
+        self.suggester = AlternativeSuggester()
+        self.compliance_checker = ComplianceChecker()
+        self.executor = ClauseExecutor()
+        self.logger = AuditLogger() if audit else None
+        self.clause_index = get_clause_index() if index else None
+
+    def _log(self, results: Dict[str, Any]):
+        if self.logger:
+            self.logger.log_analysis(results["filename"], results["contract_type"],
+                                     results["risk_summary"]["score"], results["risk_summary"])
+
+    def _index(self, results: Dict[str, Any], clean_text: str):
+        if self.clause_index:
+            self.clause_index.add(results, ClauseIndex.make_key(clean_text))
+
+    def process_clause(self, c: Dict[str, Any], batched: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Categorizes, risk-scores and (if needed) rewrites a single extracted clause."""
+        # Categorization & Explanation
+        if batched:
+            analysis = batched["analysis"]
+        else:
+            with span("clause_analysis"):
+                analysis = self.analyzer.analyze_clause(c["content"])
+
+        # Risk Detection
+        with span("risk"):
+            detected_risks = self.risk_detector.detect_risks(c["content"])
+
+        # Ambiguity Detection
+        if batched:
+            ambiguities = batched["ambiguities"]
+        else:
+            with span("ambiguity"):
+                ambiguities = self.ambiguity_detector.detect_ambiguities_llm(c["content"])
+
+        # Scoring
+        score_data = self.risk_scorer.calculate_clause_score(
+            analysis["category"],
+            detected_risks,
+            len(ambiguities)
+        )
+
+        # Alternative Suggestion for High/Medium Risk
+        alternative_data = {}
+        if score_data["label"] in ["HIGH", "MEDIUM"] and detected_risks:
+            with span("suggest"):
+                alternative_data = self.suggester.suggest_alternative(c["content"], detected_risks)
+
+        return {
+            "header": c["header"],
+            "content": c["content"],
+            "start": c["start"],
+            "end": c["end"],
+            "category": analysis["category"],
+            "explanation": analysis["explanation"],
+            "detected_risks": detected_risks,
+            "ambiguities": ambiguities,
+            "risk_score": score_data["score"],
+            "risk_label": score_data["label"],
+            "risk_color": score_data["color"],
+            "alternative": alternative_data.get("alternative"),
+            "alternative_explanation": alternative_data.get("explanation")
+        }
+
+    def iter_run(self, file_path: str, filename: Optional[str] = None, force: bool = False,
+                 progress: Optional[Callable[[str], None]] = None) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Analyzes one contract, yielding results as soon as each stage has them.
+
+        Events arrive in this order: ("overview", ...) with the contract type and entities,
+        one ("clause", {"index", "clause"}) per clause in completion order,
+        ("compliance", ...) and finally ("complete", results).
+        """
+        filename = filename or file_path
+        # Spans never straddle a yield, so the consumer's code is not traced between events
+        trace = Trace(filename)
+        with trace.span("parse"):
+            clean_text, streamed_clauses = self._read(file_path)
+
+        # Result Cache - identical documents skip translation and LLM calls
+        cached = None
+        if self.cache:
+            with trace.span("cache_lookup"):
+                cache_key = self.result_cache.make_key(clean_text)
+                cached = None if force else self.result_cache.get(cache_key)
+            trace.incr("result_cache.hits" if cached else "result_cache.misses")
+        if cached:
+            results = dict(cached, filename=filename, from_cache=True)
+            yield "overview", self._overview(results, len(results["clauses"]))
+            for index, clause in enumerate(results["clauses"]):
+                yield "clause", {"index": index, "clause": clause}
+            yield "compliance", {"compliance_issues": results["compliance_issues"]}
+            with trace.span("audit"):
+                self._log(results)
+            # Documents analysed before the index existed are added on their next cache hit
+            with trace.span("index"):
+                self._index(results, clean_text)
+            # The stored trace describes the original run; report this one instead
+            results["trace"] = trace.to_dict()
+            yield "complete", results
+            return
+
+        # Language Detection & Translation
+        with trace.span("detect_language"):
+            is_hindi = self.lang_detector.is_hindi(clean_text)
+
+        analysis_text = clean_text
+        if is_hindi:
+            if progress:
+                progress("Hindi contract detected. Translating for analysis...")
+            with trace.span("translate"):
+                analysis_text = self.translator.translate_to_english(clean_text)
+
+        # Classification
+        with trace.span("classify"):
+            contract_type = self.classifier.classify(analysis_text)
+
+        # Entity Extraction
+        with trace.span("extract_entities"):
+            entities = self.entity_extractor.extract(analysis_text)
+
+        # Clause Extraction - clauses found while reading are offsets into the untranslated text
+        with trace.span("extract_clauses"):
+            if streamed_clauses is not None and not is_hindi:
+                clauses = streamed_clauses
+            else:
+                clauses = self.extractor.extract_clauses(analysis_text)
+        trace.incr("clauses", len(clauses))
+
+        results = {
+            "filename": filename,
+            "contract_type": contract_type,
+            "entities": entities,
+            "clauses": [],
+            "risk_summary": None,
+            "compliance_issues": [],
+            "is_hindi": is_hindi
+        }
+        yield "overview", self._overview(results, len(clauses))
+
+        # Batched mode answers categorization and ambiguities for many clauses per request
+        batched_results = [None] * len(clauses)
+        if LLM_BATCH_MODE:
+            with trace.span("batch_analysis"):
+                batch_analyzer = BatchClauseAnalyzer(self.analyzer, self.ambiguity_detector)
+                batched_results = batch_analyzer.analyze_clauses([c["content"] for c in clauses], self.executor)
+
+        # Per-clause stages are independent LLM round-trips, so fan them out and
+        # hand each clause over as soon as it is done
+        processed_clauses = [None] * len(clauses)
+        process = trace.bind(lambda item: self.process_clause(*item), name="clause")
+        for index, clause in self.executor.iter_completed(process, list(zip(clauses, batched_results))):
+            processed_clauses[index] = clause
+            yield "clause", {"index": index, "clause": clause}
+        results["clauses"] = processed_clauses
+
+        # Contract Level Score
+        with trace.span("score"):
+            results["risk_summary"] = self.risk_scorer.calculate_contract_score(processed_clauses)
+
+        # Compliance Check
+        with trace.span("compliance"):
+            results["compliance_issues"] = self.compliance_checker.check_compliance(contract_type, analysis_text)
+        yield "compliance", {"compliance_issues": results["compliance_issues"]}
+
+        # Audit Log
+        with trace.span("audit"):
+            self._log(results)
+
+        # Semantic Clause Index
+        with trace.span("index"):
+            self._index(results, clean_text)
+
+        results["trace"] = trace.to_dict()
+        if self.cache:
+            self.result_cache.put(cache_key, results)
+
+        yield "complete", results
+
+    def _read(self, file_path: str) -> Tuple[str, Optional[List[Dict[str, Any]]]]:
+        """Returns the cleaned text and, when the document is streamed, its clauses.
+
+        Clause detection runs on each block as it is read, overlapping extraction. PDFs
+        sharded across PDF_WORKERS processes are read whole and their clauses left to
+        the caller.
+        """
+        if os.path.splitext(file_path)[1].lower() == ".pdf" and PDF_WORKERS > 1:
+            return self.parser.clean_text(self.parser.parse(file_path)), None
+        blocks = []
+        def read():
+            for block in self.parser.iter_clean_blocks(file_path):
+                blocks.append(block)
+                yield block
+        clauses = list(self.extractor.iter_clauses(read()))
+        return "\n".join(blocks), clauses
+
+    @staticmethod
+    def _overview(results: Dict[str, Any], clause_count: int) -> Dict[str, Any]:
+        overview = {key: results[key] for key in ("filename", "contract_type", "entities", "is_hindi")}
+        overview["clause_count"] = clause_count
+        overview["from_cache"] = results.get("from_cache", False)
+        return overview
+
+    def run(self, file_path: str, filename: Optional[str] = None, force: bool = False,
+            progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """Analyzes one contract file; progress receives human-readable status messages."""
+        for event, payload in self.iter_run(file_path, filename, force=force, progress=progress):
+            if event == "complete":
+                return payload
+
+def run_analysis(file_path: str, filename: Optional[str] = None, force: bool = False,
+                 progress: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+    """Convenience wrapper that analyzes a single contract with a fresh pipeline."""
+    return AnalysisPipeline().run(file_path, filename, force=force, progress=progress)
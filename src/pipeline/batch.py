@@ -0,0 +1,245 @@
+import argparse
+import glob
+import hashlib
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from src.config import BATCH_WORKERS
+from src.core.tracing import to_chrome_trace
+
+# One pipeline per worker process, built by the pool initializer so models load once
+_worker_pipeline = None
+
+def share_rate_limits(workers: int):
+    """Gives this process 1/workers of the LLM rate limits, which each process enforces on its own."""
+    from src.core.llm_gateway import LLMGateway
+    from src.core.registry import set_llm_gateway
+    from src.config import LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+    set_llm_gateway(LLMGateway(requests_per_minute=LLM_REQUESTS_PER_MINUTE / workers,
+                               tokens_per_minute=LLM_TOKENS_PER_MINUTE / workers))
+
+def _init_worker(audit: bool = True, workers: int = 1, index: bool = True):
+    global _worker_pipeline
+    from src.pipeline.analysis import AnalysisPipeline
+    if workers > 1:
+        share_rate_limits(workers)
+    _worker_pipeline = AnalysisPipeline(audit=audit, index=index)
+
+def _analyze_file(file_path: str, force: bool = False) -> Tuple[str, Optional[Dict[str, Any]], Optional[str], float]:
+    """Worker entry point; returns (path, results, error, seconds) instead of raising."""
+    started = time.perf_counter()
+    try:
+        results = _worker_pipeline.run(file_path, os.path.basename(file_path), force=force)
+        return file_path, results, None, time.perf_counter() - started
+    except Exception as e:
+        return file_path, None, f"{type(e).__name__}: {e}", time.perf_counter() - started
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+class BatchRunner:
+    """Analyzes many contracts across a process pool, writing one result per contract.
+
+    Output is either a directory of JSON files or a single JSONL file. Contracts that
+    already have a result are skipped, so an interrupted run resumes where it stopped;
+    JSONL runs keep a list of finished paths next to the output for that.
+    """
+
+    SUPPORTED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.txt')
+
+    def __init__(self, output: str, workers: int = BATCH_WORKERS, jsonl: bool = False,
+                 force: bool = False, audit: bool = True, trace_dir: Optional[str] = None, index: bool = True):
+        self.output = output
+        self.trace_dir = trace_dir
+        self.workers = max(1, int(workers))
+        self.jsonl = jsonl
+        self.force = force
+        self.audit = audit
+        self.index = index
+        if jsonl:
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        else:
+            os.makedirs(output, exist_ok=True)
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+
+    @classmethod
+    def collect_inputs(cls, patterns: Iterable[str]) -> List[str]:
+        """Expands directories (recursively) and glob patterns into supported contract files."""
+        found = []
+        for pattern in patterns:
+            if os.path.isdir(pattern):
+                matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+            else:
+                matches = glob.glob(pattern, recursive=True)
+            found.extend(
+                os.path.abspath(m) for m in matches
+                if os.path.isfile(m) and os.path.splitext(m)[1].lower() in cls.SUPPORTED_EXTENSIONS
+            )
+        return sorted(set(found))
+
+    def output_path(self, file_path: str) -> str:
+        """Per-contract JSON path; the path hash keeps same-named files apart."""
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        digest = hashlib.sha1(os.path.abspath(file_path).encode("utf-8")).hexdigest()[:10]
+        return os.path.join(self.output, f"{stem}-{digest}.json")
+
+    @property
+    def done_path(self) -> str:
+        """JSONL mode: source paths with a result, one per line."""
+        return f"{self.output}.done"
+
+    def completed(self, files: List[str]) -> Set[str]:
+        """Source paths that already have a result in the output."""
+        if not self.jsonl:
+            # Results are written atomically, so an existing file is a finished contract
+            return {f for f in files if os.path.exists(self.output_path(f))}
+
+        if not os.path.exists(self.output):
+            # A done list without its results is stale
+            if os.path.exists(self.done_path):
+                os.remove(self.done_path)
+            return set()
+        if not os.path.exists(self.done_path):
+            self._rebuild_done_list()
+        with open(self.done_path, 'r', encoding='utf-8') as f:
+            # A line without its newline was cut off by an interrupted run
+            return {line[:-1] for line in f if line.endswith("\n")}
+
+    def _rebuild_done_list(self):
+        """Recreates the done list from the results, for JSONL files written without one."""
+        done = []
+        with open(self.output, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    done.append(json.loads(line)["source_path"])
+                except (ValueError, KeyError):
+                    # A truncated last line from an interrupted run - redo that contract
+                    continue
+        tmp_path = f"{self.done_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{path}\n" for path in done)
+        os.replace(tmp_path, self.done_path)
+
+    def write_result(self, file_path: str, results: Dict[str, Any]):
+        record = dict(results, source_path=file_path)
+        if self.jsonl:
+            # Start on a fresh line if an interrupted run left a partial record behind
+            needs_newline = False
+            if os.path.exists(self.output) and os.path.getsize(self.output) > 0:
+                with open(self.output, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b"\n"
+            with open(self.output, 'a', encoding='utf-8') as f:
+                if needs_newline:
+                    f.write("\n")
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            # Recorded only once the result line is written, so resuming never reads the results
+            with open(self.done_path, 'a', encoding='utf-8') as f:
+                f.write(file_path + "\n")
+            return
+
+        # Atomic write so a crash never leaves a half-written file that resume would trust
+        path = self.output_path(file_path)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=2, default=str)
+        os.replace(tmp_path, path)
+
+    def write_trace(self, file_path: str, trace: Dict[str, Any]):
+        """Writes the run's trace in Chrome Trace Event format next to the other traces."""
+        name = os.path.basename(self.output_path(file_path))[:-len(".json")] + ".trace.json"
+        with open(os.path.join(self.trace_dir, name), 'w', encoding='utf-8') as f:
+            json.dump(to_chrome_trace(trace), f)
+
+    def _results(self, files: List[str]):
+        if not files:
+            return
+        if self.workers == 1 or len(files) <= 1:
+            _init_worker(self.audit, index=self.index)
+            for file_path in files:
+                yield _analyze_file(file_path, self.force)
+            return
+
+        workers = min(self.workers, len(files))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(self.audit, workers, self.index)) as pool:
+            futures = [pool.submit(_analyze_file, file_path, self.force) for file_path in files]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run(self, files: List[str]) -> Dict[str, Any]:
+        """Analyzes every file not already in the output and returns a throughput summary."""
+        done = self.completed(files)
+        pending = [f for f in files if f not in done]
+        skipped = len(files) - len(pending)
+        if skipped:
+            print(f"Resuming: skipping {skipped} already analyzed contract(s)")
+
+        latencies = []
+        failures = {}
+        started = time.perf_counter()
+        for index, (file_path, results, error, seconds) in enumerate(self._results(pending), start=1):
+            if error:
+                failures[file_path] = error
+                print(f"[{index}/{len(pending)}] FAILED {file_path}: {error}")
+                continue
+            self.write_result(file_path, results)
+            if self.trace_dir and results.get("trace"):
+                self.write_trace(file_path, results["trace"])
+            latencies.append(seconds)
+            print(f"[{index}/{len(pending)}] {file_path} ({seconds:.2f}s)")
+        elapsed = time.perf_counter() - started
+
+        return {
+            "total": len(files),
+            "analyzed": len(latencies),
+            "skipped": skipped,
+            "failed": len(failures),
+            "failures": failures,
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_second": round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+            "p50_seconds": round(percentile(latencies, 50), 3),
+            "p95_seconds": round(percentile(latencies, 95), 3),
+        }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze a directory or glob of contracts without the UI.")
+    parser.add_argument("inputs", nargs="+", help="Directories or glob patterns of contract files")
+    parser.add_argument("-o", "--output", required=True,
+                        help="Output directory for JSON results, or a .jsonl file with --jsonl")
+    parser.add_argument("--jsonl", action="store_true", help="Append all results to a single JSONL file")
+    parser.add_argument("-w", "--workers", type=int, default=BATCH_WORKERS, help="Worker processes")
+    parser.add_argument("--force", action="store_true", help="Bypass the result cache")
+    parser.add_argument("--no-audit", action="store_true", help="Don't write audit log entries")
+    parser.add_argument("--no-index", action="store_true", help="Don't add clauses to the semantic clause index")
+    parser.add_argument("--summary", help="Also write the throughput summary to this JSON file")
+    parser.add_argument("--traces", help="Directory for per-contract Chrome trace files (chrome://tracing, Perfetto)")
+    args = parser.parse_args(argv)
+
+    files = BatchRunner.collect_inputs(args.inputs)
+    if not files:
+        print("No supported contract files found.")
+        return 1
+
+    runner = BatchRunner(args.output, workers=args.workers, jsonl=args.jsonl,
+                         force=args.force, audit=not args.no_audit, trace_dir=args.traces,
+                         index=not args.no_index)
+    summary = runner.run(files)
+
+    print(
+        f"Analyzed {summary['analyzed']} of {summary['total']} contract(s) "
+        f"({summary['skipped']} skipped, {summary['failed']} failed) in {summary['elapsed_seconds']}s - "
+        f"{summary['docs_per_second']} docs/sec, p50 {summary['p50_seconds']}s, p95 {summary['p95_seconds']}s"
+    )
+    if args.summary:
+        with open(args.summary, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+    return 1 if summary["failed"] else 0
@@ -0,0 +1,42 @@
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Iterator, List, Tuple, TypeVar
+from src.config import CLAUSE_CONCURRENCY
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class ClauseExecutor:
+    """Runs per-clause analysis stages concurrently with a bounded worker pool."""
+
+    def __init__(self, max_workers: int = CLAUSE_CONCURRENCY):
+        self.max_workers = max(1, int(max_workers))
+
+    def map(self, func: Callable[[T], R], items: Iterable[T]) -> List[R]:
+        """Applies func to every item and returns the results in input order."""
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            # Serial path - identical to the original per-clause loop
+            return [func(item) for item in items]
+
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clause") as pool:
+            # Each task runs in a copy of the caller's context so tracing spans nest correctly
+            futures = [pool.submit(contextvars.copy_context().run, func, item) for item in items]
+            # Collected in submission order regardless of completion order
+            return [future.result() for future in futures]
+
+    def iter_completed(self, func: Callable[[T], R], items: Iterable[T]) -> Iterator[Tuple[int, R]]:
+        """Applies func to every item, yielding (index, result) as each one finishes."""
+        items = list(items)
+        if self.max_workers == 1 or len(items) <= 1:
+            for index, item in enumerate(items):
+                yield index, func(item)
+            return
+
+        workers = min(self.max_workers, len(items))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="clause") as pool:
+            futures = {pool.submit(contextvars.copy_context().run, func, item): index
+                       for index, item in enumerate(items)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+from src.config import API_WORKERS, API_QUEUE_SIZE, API_JOB_TTL_SECONDS
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity."""
+
+class AnalysisJobQueue:
+    """In-process asyncio job queue that runs contract analyses on a bounded worker pool.
+
+    Submissions beyond max_queue pending jobs are rejected instead of piling up, and
+    every job records how long it waited and how long it ran.
+    """
+
+    def __init__(self, analyze: Optional[Callable[..., Dict[str, Any]]] = None,
+                 workers: int = API_WORKERS, max_queue: int = API_QUEUE_SIZE,
+                 job_ttl: float = API_JOB_TTL_SECONDS):
+        self.analyze = analyze or self._run_pipeline
+        self.workers = max(1, int(workers))
+        self.max_queue = max(1, int(max_queue))
+        self.job_ttl = job_ttl
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._events: Dict[str, asyncio.Event] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+
+    def _run_pipeline(self, file_path: str, filename: str, force: bool = False) -> Dict[str, Any]:
+        # One pipeline per worker thread, so no component is ever used by two jobs at once;
+        # the registry still shares the models between them
+        pipeline = getattr(self._local, "pipeline", None)
+        if pipeline is None:
+            from src.pipeline.analysis import AnalysisPipeline
+            pipeline = self._local.pipeline = AnalysisPipeline()
+        return pipeline.run(file_path, filename, force=force)
+
+    async def start(self):
+        """Starts the worker tasks; must be called from the serving event loop."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="analysis")
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def submit(self, file_path: str, filename: str, force: bool = False,
+               cleanup: bool = False) -> Dict[str, Any]:
+        """Queues a document for analysis; raises QueueFullError when at capacity."""
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        self._prune()
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "filename": filename,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "queue_seconds": None,
+            "run_seconds": None,
+            "result": None,
+            "error": None,
+        }
+        try:
+            self._queue.put_nowait((job_id, file_path, force, cleanup))
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue} pending)")
+        self.jobs[job_id] = job
+        self._events[job_id] = asyncio.Event()
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        self._prune()
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Waits up to timeout seconds for a job to finish and returns its current state."""
+        event = self._events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(job_id)
+
+    def stats(self) -> Dict[str, int]:
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for job in self.jobs.values():
+            counts[job["status"]] += 1
+        return dict(counts, workers=self.workers, capacity=self.max_queue)
+
+    def _prune(self):
+        """Forgets finished jobs older than the TTL."""
+        cutoff = time.time() - self.job_ttl
+        expired = [job_id for job_id, job in self.jobs.items()
+                   if job["finished_at"] is not None and job["finished_at"] < cutoff]
+        for job_id in expired:
+            self.jobs.pop(job_id, None)
+            self._events.pop(job_id, None)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job_id, file_path, force, cleanup = await self._queue.get()
+            job = self.jobs[job_id]
+            job["status"] = "running"
+            job["started_at"] = time.time()
+            job["queue_seconds"] = round(job["started_at"] - job["submitted_at"], 3)
+            started = time.perf_counter()
+            try:
+                job["result"] = await loop.run_in_executor(
+                    self._pool, self.analyze, file_path, job["filename"], force
+                )
+                job["status"] = "done"
+            except Exception as e:
+                print(f"Analysis job {job_id} error: {e}")
+                job["error"] = str(e)
+                job["status"] = "failed"
+            finally:
+                job["run_seconds"] = round(time.perf_counter() - started, 3)
+                job["finished_at"] = time.time()
+                if cleanup and os.path.exists(file_path):
+                    os.remove(file_path)
+                self._events[job_id].set()
+                self._queue.task_done()
+                # Expired results are dropped even when no new jobs arrive
+                self._prune()
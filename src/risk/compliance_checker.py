@@ -1,32 +1,44 @@
-import openai
 from typing import List, Dict, Any
-from src.config import OPENAI_API_KEY, LLM_MODEL
+from src.core.registry import get_llm_gateway
+from src.core.prompt_builder import PromptBuilder
+from src.nlp.keyword_matcher import KeywordMatcher
 
 class ComplianceChecker:
     """Checks contract compliance with general Indian business law principles."""
     
-    def __init__(self):
-        pass
-
-    def check_compliance(self, contract_type: str, text: str) -> List[Dict[str, Any]]:
-        """Identifies potential compliance issues based on common Indian laws."""
-        if not OPENAI_API_KEY:
-            return self._heuristic_check(contract_type, text)
-
-        prompt = f"""
+    PROMPT_TEMPLATE = """
         Identify potential legal compliance issues in this {contract_type} according to Indian laws (e.g., Contract Act, Companies Act, IT Act, Labour Laws).
         Focus on SMEs.
         
         Contract Content (Sample):
-        {text[:5000]}
+        {sample_text}
         
         Provide result in JSON format as a list of issues with: 'issue', 'law', 'risk', 'recommendation'.
         """
+    
+    TERM_MATCHER = KeywordMatcher(["stamp duty", "gratuity"])
+    
+    # Sections touching these topics are sent first when the contract exceeds the budget
+    SECTION_MATCHER = KeywordMatcher([
+        "stamp", "gratuity", "provident fund", "state insurance", "minimum wage", "bonus", "leave", "gst", "tds", "tax",
+        "indemn", "liabilit", "penalt", "terminat", "non-compete", "confidential", "personal data",
+        "intellectual property", "arbitration", "jurisdiction", "governing law", "registration", "licen"
+    ])
+
+    def __init__(self):
+        self.prompt_builder = PromptBuilder()
+
+    def check_compliance(self, contract_type: str, text: str) -> List[Dict[str, Any]]:
+        """Identifies potential compliance issues based on common Indian laws."""
+        if not get_llm_gateway().is_available():
+            return self._heuristic_check(contract_type, text)
+
+        sample_text = self.prompt_builder.fit("compliance", text, self.PROMPT_TEMPLATE, self.SECTION_MATCHER)
+        prompt = self.PROMPT_TEMPLATE.format(contract_type=contract_type, sample_text=sample_text)
 
         try:
-            client = openai.OpenAI(api_key=OPENAI_API_KEY)
-            response = client.chat.completions.create(
-                model=LLM_MODEL,
+            response = get_llm_gateway().chat(
+                "compliance_check",
                 messages=[
                     {"role": "system", "content": "You are an Indian legal compliance expert for SMEs. Output ONLY valid JSON."},
                     {"role": "user", "content": prompt}
@@ -43,9 +55,9 @@ class ComplianceChecker:
     def _heuristic_check(self, contract_type: str, text: str) -> List[Dict[str, Any]]:
         """Basic heuristic-based compliance checks."""
         issues = []
-        text_lower = text.lower()
+        found = self.TERM_MATCHER.found(text)
         
-        if "stamp duty" not in text_lower:
+        if "stamp duty" not in found:
             issues.append({
                 "issue": "Stamp Duty Mention Missing",
                 "law": "Indian Stamp Act, 1899",
@@ -53,7 +65,7 @@ class ComplianceChecker:
                 "recommendation": "Ensure appropriate stamp duty is paid and mentioned."
             })
             
-        if contract_type == "Employment Agreement" and "gratuity" not in text_lower:
+        if contract_type == "Employment Agreement" and "gratuity" not in found:
             issues.append({
                 "issue": "Gratuity Policy Not Specified",
                 "law": "Payment of Gratuity Act, 1972",
@@ -1,5 +1,5 @@
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 
 class RiskDetector:
     """Detects specific high-risk legal clauses."""
@@ -15,16 +15,39 @@ class RiskDetector:
         "Limitation of Liability": r'\b(limitation of liability|maximum liability|aggregate liability)\b'
     }
 
+    # Every category compiled into one alternation with a named group per category,
+    # so a single case-insensitive scan reports all categories and their spans.
+    # Category terms don't overlap, so no match can hide another category's match.
+    _GROUP_TO_RISK = {f"risk_{i}": name for i, name in enumerate(RISK_PATTERNS)}
+    COMBINED_REGEX = re.compile(
+        "|".join(
+            f"(?P<risk_{i}>{pattern.replace('(', '(?:')})"
+            for i, pattern in enumerate(RISK_PATTERNS.values())
+        ),
+        re.IGNORECASE
+    )
+    _RISK_ORDER = {name: i for i, name in enumerate(RISK_PATTERNS)}
+
+    def scan(self, clause_text: str) -> Dict[str, Any]:
+        """Returns the matched risk categories and every match span in one pass."""
+        spans = []
+        for match in self.COMBINED_REGEX.finditer(clause_text):
+            spans.append({
+                "category": self._GROUP_TO_RISK[match.lastgroup],
+                "match": match.group(),
+                "start": match.start(),
+                "end": match.end()
+            })
+        risks = sorted({span["category"] for span in spans}, key=self._RISK_ORDER.get)
+        return {"risks": risks, "spans": spans}
+
     def detect_risks(self, clause_text: str) -> List[str]:
         """Identifies which risk categories a clause belongs to."""
-        text_lower = clause_text.lower()
-        found_risks = []
-        
-        for risk_name, pattern in self.RISK_PATTERNS.items():
-            if re.search(pattern, text_lower):
-                found_risks.append(risk_name)
-        
-        return found_risks
+        return self.scan(clause_text)["risks"]
+
+    def detect_risks_many(self, clauses: Iterable[str]) -> List[List[str]]:
+        """Identifies risk categories for every clause of a contract."""
+        return [self.detect_risks(text) for text in clauses]
 
     def get_risk_description(self, risk_name: str) -> str:
         """Returns a predefined description of why a category is risky."""
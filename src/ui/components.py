@@ -1,7 +1,9 @@
+import json
 import streamlit as st
 import plotly.express as px
 import pandas as pd
 from typing import List, Dict, Any
+from src.core.tracing import to_chrome_trace
 
 def render_risk_gauge(score: float, label: str, color: str):
     """Renders a risk gauge using Plotly."""
@@ -20,13 +22,19 @@ def render_risk_gauge(score: float, label: str, color: str):
     )
     st.plotly_chart(fig, use_container_width=True)
 
-def render_clause_card(clause: Dict[str, Any], index: int):
-    """Renders a single clause analysis card."""
+def render_clause_card(clause: Dict[str, Any], index: int, translated: bool = False):
+    """Renders a single clause analysis card.
+
+    For translated documents the clause offsets refer to the English translation.
+    """
     with st.expander(f"Clause {index}: {clause['header'][:100]}...", expanded=False):
         col1, col2 = st.columns([3, 1])
         
         with col1:
             st.markdown(f"**Category:** {clause['category']}")
+            if clause.get("start") is not None:
+                source = "English translation" if translated else "Source"
+                st.caption(f"{source} characters {clause['start']}-{clause['end']}")
             st.markdown(f"**Explanation:** {clause['explanation']}")
             
             if clause.get("detected_risks"):
@@ -50,6 +58,18 @@ def render_clause_card(clause: Dict[str, Any], index: int):
             st.success(clause["alternative"])
             st.info(f"*Rationale:* {clause['alternative_explanation']}")
 
+def render_compliance_issues(issues: List[Dict[str, Any]]):
+    """Renders the compliance findings, one expander per issue."""
+    st.subheader("Legal Compliance (Indian Law)")
+    if issues:
+        for issue in issues:
+            with st.expander(issue["issue"]):
+                st.write(f"**Relevant Law:** {issue['law']}")
+                st.write(f"**Risk:** {issue['risk']}")
+                st.info(f"**Recommendation:** {issue['recommendation']}")
+    else:
+        st.success("No major compliance issues detected based on preliminary analysis.")
+
 def render_entity_summary(entities: Dict[str, Any]):
     """Renders the extracted entities summary."""
     st.subheader("📌 Key Entities & Terms")
@@ -72,3 +92,28 @@ def render_entity_summary(entities: Dict[str, Any]):
     with cols[2]:
         st.markdown("**Jurisdiction**")
         st.write(struct.get("Governing Law/Jurisdiction", "N/A"))
+
+def render_trace_panel(trace: Dict[str, Any]):
+    """Renders per-stage timings and counters for one analysis, with a trace download."""
+    with st.expander("🩺 Diagnostics", expanded=False):
+        st.caption(f"Total wall time {trace['total_seconds']:.2f}s - per-clause stages run in parallel, so their totals can exceed it")
+        
+        stages = pd.DataFrame([
+            {"stage": name, "calls": s["count"], "total_s": round(s["total_seconds"], 3), "max_s": round(s["max_seconds"], 3)}
+            for name, s in trace.get("stages", {}).items()
+        ])
+        if not stages.empty:
+            st.dataframe(stages.sort_values("total_s", ascending=False), use_container_width=True, hide_index=True)
+        
+        counters = trace.get("counters", {})
+        if counters:
+            st.markdown("**Counters** (LLM calls and tokens, cache hits)")
+            st.dataframe(pd.DataFrame([{"counter": k, "value": v} for k, v in sorted(counters.items())]),
+                         use_container_width=True, hide_index=True)
+        
+        st.download_button(
+            "Download trace (Chrome / Perfetto JSON)",
+            json.dumps(to_chrome_trace(trace)),
+            file_name="analysis-trace.json",
+            mime="application/json"
+        )